@@ -0,0 +1,89 @@
+import os
+import re
+import subprocess
+from pathlib import Path
+
+HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+def run_git(args, cwd):
+    result = subprocess.run(
+        ["git", *args], cwd=cwd, capture_output=True, text=True, check=True
+    )
+    return result.stdout
+
+
+def git_toplevel(path):
+    """Корень git-репозитория, в котором лежит path"""
+    return Path(run_git(["rev-parse", "--show-toplevel"], path).strip())
+
+
+def parse_diff_path(line):
+    # Git добавляет табуляцию после путей с пробелами
+    path = line[len("+++ ") :].rstrip("\t")
+    # С core.quotePath=false в кавычки берутся только пути со спецсимволами
+    if path.startswith('"') and path.endswith('"'):
+        path = path[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    if path == "/dev/null":
+        return None
+    return path[2:] if path.startswith("b/") else path
+
+
+def changed_python_files(base_path, base_rev=None):
+    """Измененные .py файлы и номера добавленных/измененных строк
+
+    Если base_rev не указан, сравнивается индекс с HEAD (git diff --cached),
+    иначе рабочее дерево с base_rev. Возвращает словарь
+    {абсолютный путь: set номеров строк} только для файлов внутри base_path.
+    """
+    base_path = Path(base_path).resolve()
+    toplevel = git_toplevel(base_path)
+    args = [
+        "-c",
+        "core.quotePath=false",
+        "diff",
+        "--unified=0",
+        "--no-color",
+        "--no-ext-diff",
+        "--diff-filter=ACMR",
+    ]
+    args.append(base_rev if base_rev else "--cached")
+    args += ["--", "*.py"]
+
+    changes = {}
+    lines = None
+    for line in run_git(args, toplevel).splitlines():
+        if line.startswith("+++ "):
+            path = parse_diff_path(line)
+            lines = None
+            if path is None:
+                continue
+            full_path = toplevel / path
+            if full_path.is_relative_to(base_path):
+                lines = changes.setdefault(str(full_path), set())
+            continue
+        match = HUNK_RE.match(line)
+        if match and lines is not None:
+            start = int(match.group(1))
+            count = int(match.group(2)) if match.group(2) is not None else 1
+            lines.update(range(start, start + count))
+    return changes
+
+
+def export_index_files(base_path, file_paths, target):
+    """Копирует версии файлов из индекса в папку target
+
+    В режиме --cached номера строк берутся из индекса, поэтому и проверять
+    нужно его содержимое, а не рабочее дерево. Файлы раскладываются в
+    target по путям репозитория (git checkout-index --prefix). Возвращает
+    {путь копии: исходный абсолютный путь}.
+    """
+    if not file_paths:
+        return {}
+    toplevel = git_toplevel(Path(base_path).resolve())
+    relative = [str(Path(path).relative_to(toplevel)) for path in file_paths]
+    prefix = os.path.join(target, "")
+    run_git(["checkout-index", f"--prefix={prefix}", "--", *relative], toplevel)
+    return {
+        os.path.join(target, rel): str(path) for rel, path in zip(relative, file_paths)
+    }
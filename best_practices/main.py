@@ -1,7 +1,19 @@
 import re
 import os
 import ast
+import mmap
+import codecs
+import sys
+import argparse
+import itertools
+import tempfile
+from collections import deque
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from manifest import AuditManifest, default_manifest_path, file_digest
+from writers import write_issues, ISSUE_FORMATS
+from git_changes import changed_python_files, export_index_files
 
 IGNORED_EXTENSIONS = {".pyc", ".pyo", ".pyd", ".so", ".dll"}
 IGNORED_NAMES = {".venv", "venv", "env", ".env", "__pycache__"}
@@ -37,14 +49,65 @@ SECRET_PATTERNS = {
     "AWS_KEYS": r'aws[_-]?(secret|key)["\']?\s*[=:]\s*["\']?([a-zA-Z0-9+/]{20,})["\']?',
     "PRIVATE_KEY": r"-----BEGIN (RSA|DSA|EC|OPENSSH) PRIVATE KEY-----",
 }
+SECRET_REGEXES = {
+    name: re.compile(pattern, re.IGNORECASE)
+    for name, pattern in SECRET_PATTERNS.items()
+}
+SECRET_BYTES_REGEXES = {
+    name: re.compile(pattern.encode(), re.IGNORECASE)
+    for name, pattern in SECRET_PATTERNS.items()
+}
+BINARY_SNIFF_SIZE = 8192
+MAX_SCAN_FILE_SIZE = 10 * 1024 * 1024
 MAX_FUNCTION_LENGTH = 50
 MAX_CYCLOMATIC_COMPLEXITY = 10
 MAX_NESTING_DEPTH = 4
+CHUNKS_PER_JOB = 4
+MAX_CHUNK_SIZE = 256
+
+
+def resolve_jobs(jobs):
+    """Количество процессов: 0 или None означает все ядра"""
+    if not jobs:
+        return os.cpu_count() or 1
+    return max(1, jobs)
+
+
+def iter_chunks(func, items, jobs):
+    """Обрабатывает items пачками в пуле процессов и отдает issues по мере готовности
+
+    func получает список элементов и возвращает список issues. Порядок
+    результатов совпадает с порядком items, а в работе одновременно держится
+    не больше 2 * jobs пачек, поэтому память не растет с размером проекта.
+    """
+    items = list(items)
+    if jobs <= 1 or len(items) < 2:
+        for item in items:
+            yield from func([item])
+        return
+
+    chunk_size = -(-len(items) // (jobs * CHUNKS_PER_JOB))
+    chunk_size = max(1, min(chunk_size, MAX_CHUNK_SIZE))
+    chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(func, chunk))
+            if len(pending) >= jobs * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def map_chunks(func, items, jobs):
+    """То же, что iter_chunks, но возвращает список всех issues"""
+    return list(iter_chunks(func, items, jobs))
 
 
 class UniversalChecker:
-    def __init__(self, base_path):
+    def __init__(self, base_path, jobs=1):
         self.base_path = Path(base_path)
+        self.jobs = resolve_jobs(jobs)
 
     def check_basic_structure(self):
         """Проверка наличия основных папок и файлов"""
@@ -136,18 +199,27 @@ class UniversalChecker:
     """
 
     def analyze_file_content(self, content, file_path):
-        """Анализирует содержимое файла на наличие credentials"""
+        """Анализирует содержимое файла на наличие credentials
+
+        content может быть строкой или bytes-like объектом (например, mmap).
+        """
         issues = []
 
-        for secret_type, pattern in SECRET_PATTERNS.items():
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                line_number = content[: match.start()].count("\n") + 1
-                secret_preview = (
-                    match.group(0)[:50] + "..."
-                    if len(match.group(0)) > 50
-                    else match.group(0)
-                )
+        if isinstance(content, str):
+            regexes, newline = SECRET_REGEXES, "\n"
+        else:
+            regexes, newline = SECRET_BYTES_REGEXES, b"\n"
+
+        for secret_type, regex in regexes.items():
+            # Номер строки считаем инкрементально от предыдущего совпадения
+            line_number, last_pos = 1, 0
+            for match in regex.finditer(content):
+                line_number += content[last_pos : match.start()].count(newline)
+                last_pos = match.start()
+                found = match.group(0)
+                if not isinstance(found, str):
+                    found = found.decode("utf-8", errors="ignore")
+                secret_preview = found[:50] + "..." if len(found) > 50 else found
 
                 issues.append(
                     {
@@ -174,10 +246,9 @@ class UniversalChecker:
 
         return False
 
-    def scan_for_credentials(self):
-        """Сканирует проект на наличие credentials"""
-        issues = []
-
+    def get_credential_candidates(self):
+        """Список файлов проекта, которые нужно проверить на credentials"""
+        files_lst = []
         for file_path in self.base_path.rglob("*"):
             if not file_path.is_file():
                 continue
@@ -186,30 +257,62 @@ class UniversalChecker:
             if self.is_git_ignored(file_path):
                 continue
 
-            # Пропускаем бинарные файлы
-            if self.is_binary_file(file_path):
-                continue
-
-            try:
-                with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                    content = f.read()
-
-                file_issues = self.analyze_file_content(content, file_path)
-                issues.extend(file_issues)
+            files_lst.append(file_path)
+        return files_lst
 
-            except (UnicodeDecodeError, PermissionError, IOError):
-                continue
+    def scan_for_credentials(self):
+        """Сканирует проект на наличие credentials"""
+        return list(self.iter_credentials())
+
+    def iter_credentials(self):
+        """Отдает найденные credentials по мере сканирования"""
+        return iter_chunks(
+            partial(_scan_credentials_chunk, self.base_path),
+            self.get_credential_candidates(),
+            self.jobs,
+        )
 
+    def scan_files_for_credentials(self, file_paths):
+        """Последовательно сканирует переданные файлы на наличие credentials"""
+        issues = []
+        for file_path in file_paths:
+            issues.extend(self.scan_file_for_credentials(file_path))
         return issues
 
+    def scan_file_for_credentials(self, file_path):
+        """Читает файл один раз через mmap и ищет в нем credentials"""
+        try:
+            with open(file_path, "rb") as f:
+                # Пропускаем пустые, слишком большие и бинарные файлы
+                size = os.fstat(f.fileno()).st_size
+                if not size or size > MAX_SCAN_FILE_SIZE:
+                    return []
+                if self.is_binary_prefix(f.read(BINARY_SNIFF_SIZE)):
+                    return []
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    return self.analyze_file_content(content, file_path)
+        except (OSError, ValueError):
+            return []
+
     def is_binary_file(self, file_path):
-        """Проверяет, является ли файл бинарным"""
+        """Проверяет, является ли файл бинарным, по первым байтам"""
+        try:
+            with open(file_path, "rb") as check_file:
+                return self.is_binary_prefix(check_file.read(BINARY_SNIFF_SIZE))
+        except OSError:
+            return True
+
+    def is_binary_prefix(self, chunk):
+        """Бинарным считаем префикс с нулевыми байтами или не в UTF-8"""
+        if b"\0" in chunk:
+            return True
+        # Неполный многобайтный символ на границе префикса не считается ошибкой
+        decoder = codecs.getincrementaldecoder("utf-8")()
         try:
-            with open(file_path, "tr") as check_file:
-                check_file.read()
-            return False
+            decoder.decode(chunk, final=False)
         except UnicodeDecodeError:
             return True
+        return False
 
     """
     Testing & Documentation
@@ -697,10 +800,18 @@ class UniversalChecker:
 
 
 class CustomStaticAnalyzer:
-    def __init__(self, base_path):
+    def __init__(self, base_path, jobs=1, python_files=None):
         self.base_path = Path(base_path)
-        self.python_files_lst = self.get_python_files()
-        self.universal_checker = UniversalChecker(self.base_path)
+        self.jobs = resolve_jobs(jobs)
+        self._python_files_lst = None if python_files is None else list(python_files)
+        self.universal_checker = UniversalChecker(self.base_path, jobs=self.jobs)
+
+    @property
+    def python_files_lst(self):
+        """Список .py файлов проекта, обход диска - только при первом обращении"""
+        if self._python_files_lst is None:
+            self._python_files_lst = self.get_python_files()
+        return self._python_files_lst
 
     def get_python_files(self):
         files_lst = []
@@ -721,20 +832,24 @@ class CustomStaticAnalyzer:
 
     def analyze_project_structure(self):
         """Полный анализ структуры проекта"""
-        issues = []
-        issues.extend(self.universal_checker.check_basic_structure())
-        issues.extend(self.universal_checker.check_gitignore())
-        issues.extend(self.universal_checker.scan_for_credentials())
-        return issues
+        return list(self.iter_project_structure())
+
+    def iter_project_structure(self):
+        """Анализ структуры проекта, issues отдаются по мере нахождения"""
+        yield from self.universal_checker.check_basic_structure()
+        yield from self.universal_checker.check_gitignore()
+        yield from self.universal_checker.iter_credentials()
 
     def analyze_project_best_practices(self):
         """Анализ best practices на уровне проекта"""
-        issues = []
-        issues.extend(self.universal_checker.check_test_structure(self.base_path))
-        issues.extend(self.universal_checker.check_test_coverage(self.base_path))
-        issues.extend(self.universal_checker.check_requirements_files(self.base_path))
-        issues.extend(self.universal_checker.check_module_docstring(ast.parse("")))
-        return issues
+        return list(self.iter_project_best_practices())
+
+    def iter_project_best_practices(self):
+        """Анализ best practices на уровне проекта, issues отдаются по мере нахождения"""
+        yield from self.universal_checker.check_test_structure(self.base_path)
+        yield from self.universal_checker.check_test_coverage(self.base_path)
+        yield from self.universal_checker.check_requirements_files(self.base_path)
+        yield from self.universal_checker.check_module_docstring(ast.parse(""))
 
     def analyze_ast_tree(self, tree, file_path):
         """Анализ best practices в коде"""
@@ -768,21 +883,238 @@ class CustomStaticAnalyzer:
         return ret
 
     def analyze_code_best_practices(self):
+        return list(self.iter_code_best_practices())
+
+    def iter_code_best_practices(self):
+        """Анализ best practices в коде, issues отдаются по мере анализа файлов"""
+        return iter_chunks(
+            partial(_analyze_code_chunk, self.base_path),
+            self.python_files_lst,
+            self.jobs,
+        )
+
+    def iter_issues(self):
+        """Все issues полного аудита одним потоком"""
+        yield from self.iter_project_structure()
+        yield from self.iter_project_best_practices()
+        yield from self.iter_code_best_practices()
+
+    def analyze_incremental(self, manifest_path=None):
+        """Инкрементальный аудит проекта с манифестом на диске
+
+        Повторно анализируются только новые и измененные файлы, issues
+        удаленных файлов отбрасываются, проектные проверки перезапускаются
+        только при изменении их входных файлов. Манифест по умолчанию лежит
+        вне проекта и сбрасывается при любом изменении этого модуля
+        (шаблонов секретов, порогов MAX_*).
+        """
+        manifest = AuditManifest(
+            manifest_path or default_manifest_path(self.base_path),
+            file_digest(__file__),
+        )
+        checker = self.universal_checker
+        issues = []
+
+        # Структура проекта
+        issues.extend(checker.check_basic_structure())
+        issues.extend(
+            manifest.cached_check(
+                "check_gitignore",
+                [self.base_path / ".gitignore"],
+                checker.check_gitignore,
+            )
+        )
+        candidates = [
+            file_path
+            for file_path in checker.get_credential_candidates()
+            if file_path.resolve() != manifest.path.resolve()
+        ]
+        changed = manifest.changed_files("credentials", candidates)
+        manifest.update_files(
+            "credentials",
+            changed,
+            map_chunks(
+                partial(_scan_credentials_chunk, self.base_path), changed, self.jobs
+            ),
+            "file",
+        )
+        issues.extend(manifest.collect_issues("credentials", candidates))
+
+        # Best practices на уровне проекта
+        issues.extend(checker.check_test_structure(self.base_path))
+        issues.extend(checker.check_test_coverage(self.base_path))
+        issues.extend(
+            manifest.cached_check(
+                "check_requirements_files",
+                [
+                    self.base_path / "requirements.txt",
+                    self.base_path / "pyproject.toml",
+                    self.base_path / "setup.py",
+                ],
+                partial(checker.check_requirements_files, self.base_path),
+            )
+        )
+        issues.extend(checker.check_module_docstring(ast.parse("")))
+
+        # Best practices в коде
+        changed = manifest.changed_files("code", self.python_files_lst)
+        manifest.update_files(
+            "code",
+            changed,
+            map_chunks(
+                partial(_analyze_code_chunk, self.base_path), changed, self.jobs
+            ),
+            "file_path",
+        )
+        issues.extend(manifest.collect_issues("code", self.python_files_lst))
+
+        manifest.save()
+        return issues
+
+    def iter_changes(self, base_rev=None, only_changed_lines=False):
+        """Аудит только .py файлов, измененных относительно base_rev
+
+        Без base_rev берутся изменения, добавленные в индекс, и проверяется
+        содержимое файлов из индекса, а не рабочего дерева - иначе номера
+        строк не совпадут с диффом. При only_changed_lines остаются только
+        issues на измененных строках (и issues без номера строки).
+        """
+        changes = changed_python_files(self.base_path, base_rev)
+        if base_rev:
+            yield from self._iter_changed_files(changes, only_changed_lines)
+            return
+        with tempfile.TemporaryDirectory(prefix="best_practices-") as index_dir:
+            copies = export_index_files(
+                self.base_path,
+                [
+                    file_path
+                    for file_path in changes
+                    if not self.universal_checker.is_git_ignored(Path(file_path))
+                ],
+                index_dir,
+            )
+            yield from self._iter_changed_files(changes, only_changed_lines, copies)
+
+    def _iter_changed_files(self, changes, only_changed_lines, copies=None):
+        """Issues по измененным файлам; copies - {путь копии: исходный путь}
+
+        Если copies задан, проверяются копии, а в issues подставляется
+        исходный путь.
+        """
+        if copies is None:
+            copies = {
+                file_path: file_path
+                for file_path in changes
+                if os.path.isfile(file_path)
+                and not self.universal_checker.is_git_ignored(Path(file_path))
+            }
+        file_paths = list(copies)
+        issues = itertools.chain(
+            iter_chunks(
+                partial(_scan_credentials_chunk, self.base_path), file_paths, self.jobs
+            ),
+            iter_chunks(
+                partial(_analyze_code_chunk, self.base_path), file_paths, self.jobs
+            ),
+        )
+        for issue in issues:
+            for field in ("file_path", "file"):
+                if str(issue.get(field)) in copies:
+                    issue[field] = copies[str(issue[field])]
+            if only_changed_lines and issue.get("line"):
+                file_path = issue.get("file_path") or issue.get("file")
+                if issue["line"] not in changes[str(file_path)]:
+                    continue
+            yield issue
+
+    def analyze_files(self, file_paths):
+        """Последовательный анализ best practices в переданных файлах"""
         issues = []
-        for file_path in self.python_files_lst:
+        for file_path in file_paths:
             with open(file_path, "r") as f:
                 tree = ast.parse(f.read())
             issues.extend(self.analyze_ast_tree(tree, file_path))
         return issues
 
 
-if __name__ == "__main__":
-    project_path = "/home/pascal65536/git/stand"
+def _scan_credentials_chunk(base_path, file_paths):
+    """Обработчик пачки файлов для пула процессов"""
+    return UniversalChecker(base_path).scan_files_for_credentials(file_paths)
+
 
-    analyzer = CustomStaticAnalyzer(project_path)
-    print(analyzer.analyze_project_structure())
-    print(analyzer.analyze_project_best_practices())
-    print(analyzer.analyze_code_best_practices())
+def _analyze_code_chunk(base_path, file_paths):
+    """Обработчик пачки файлов для пула процессов"""
+    analyzer = CustomStaticAnalyzer(base_path, python_files=file_paths)
+    return analyzer.analyze_files(file_paths)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Аудит best practices проекта")
+    parser.add_argument(
+        "project_path", nargs="?", default="/home/pascal65536/git/stand"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        help="Количество процессов (0 - все ядра)",
+    )
+    parser.add_argument(
+        "--incremental",
+        nargs="?",
+        const="",
+        metavar="MANIFEST",
+        help="Инкрементальный аудит с манифестом в указанном файле "
+        "(без MANIFEST - в ~/.cache/best_practices)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("repr",) + ISSUE_FORMATS,
+        default="repr",
+        help="Формат вывода: repr, потоковый jsonl или sarif",
+    )
+    parser.add_argument(
+        "-o", "--output", help="Файл для jsonl/sarif отчета (по умолчанию stdout)"
+    )
+    parser.add_argument(
+        "--diff",
+        nargs="?",
+        const="",
+        metavar="REV",
+        help="Анализировать только .py файлы, измененные относительно REV "
+        "(без REV - изменения в индексе)",
+    )
+    parser.add_argument(
+        "--changed-lines-only",
+        action="store_true",
+        help="С --diff выводить только issues на измененных строках",
+    )
+    args = parser.parse_args()
+
+    analyzer = CustomStaticAnalyzer(args.project_path, jobs=args.jobs)
+    if args.diff is not None:
+        issues = analyzer.iter_changes(args.diff or None, args.changed_lines_only)
+    elif args.incremental is not None:
+        issues = analyzer.analyze_incremental(args.incremental or None)
+    else:
+        issues = None
+
+    if args.format != "repr":
+        if issues is None:
+            issues = analyzer.iter_issues()
+        stream = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            write_issues(issues, stream, args.format, analyzer.base_path)
+        finally:
+            if args.output:
+                stream.close()
+    elif issues is not None:
+        print(list(issues))
+    else:
+        print(analyzer.analyze_project_structure())
+        print(analyzer.analyze_project_best_practices())
+        print(analyzer.analyze_code_best_practices())
 
 """
 Образовательная ценность этих проверок:
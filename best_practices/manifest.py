@@ -0,0 +1,149 @@
+import os
+import json
+import hashlib
+import tempfile
+from pathlib import Path
+
+MANIFEST_VERSION = 2
+HASH_CHUNK_SIZE = 1024 * 1024
+MANIFEST_DIR = Path.home() / ".cache" / "best_practices"
+
+
+def default_manifest_path(project_path):
+    """Манифест проекта вне его рабочего дерева: ~/.cache/best_practices/<md5>.json
+
+    В манифесте лежат найденные credentials, поэтому в проект он не пишется.
+    """
+    key = hashlib.md5(str(Path(project_path).resolve()).encode()).hexdigest()
+    return MANIFEST_DIR / f"{key}.json"
+
+
+def file_state(file_path):
+    """Быстрый отпечаток файла по stat: mtime и размер"""
+    stat = os.stat(file_path)
+    return {"mtime": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def file_digest(file_path):
+    """md5 содержимого файла, читаем кусками"""
+    md5 = hashlib.md5()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+class AuditManifest:
+    """Манифест инкрементального аудита
+
+    Для каждого файла хранит mtime, размер, хеш содержимого и найденные
+    issues, для проектных проверок - отпечатки входных файлов и результат.
+    fingerprint - отпечаток самих проверок: манифест, записанный другой
+    версией проверок, отбрасывается целиком.
+    """
+
+    def __init__(self, path, fingerprint=None):
+        self.path = Path(path)
+        self.data = {
+            "version": MANIFEST_VERSION,
+            "fingerprint": fingerprint,
+            "sections": {},
+            "project": {},
+        }
+        self.pending = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    loaded = json.load(f)
+            except (OSError, ValueError):
+                loaded = None
+            if (
+                isinstance(loaded, dict)
+                and loaded.get("version") == MANIFEST_VERSION
+                and loaded.get("fingerprint") == fingerprint
+            ):
+                self.data = loaded
+
+    def section(self, name):
+        return self.data["sections"].setdefault(name, {})
+
+    def changed_files(self, name, file_paths):
+        """Возвращает новые и измененные файлы, забывает удаленные
+
+        Файлы с изменившимся mtime, но прежним хешем, изменившимися не считаются.
+        """
+        entries = self.section(name)
+        current = {str(file_path) for file_path in file_paths}
+        for stale in set(entries) - current:
+            del entries[stale]
+
+        changed = []
+        for file_path in file_paths:
+            key = str(file_path)
+            entry = entries.get(key)
+            try:
+                state = file_state(file_path)
+                if (
+                    entry
+                    and entry["mtime"] == state["mtime"]
+                    and entry["size"] == state["size"]
+                ):
+                    continue
+                digest = file_digest(file_path)
+            except OSError:
+                continue
+            if entry and entry["hash"] == digest:
+                entry.update(state)
+                continue
+            self.pending[(name, key)] = dict(state, hash=digest)
+            changed.append(file_path)
+        return changed
+
+    def update_files(self, name, file_paths, issues, file_key):
+        """Сохраняет свежие issues для проанализированных файлов"""
+        by_file = {str(file_path): [] for file_path in file_paths}
+        for issue in issues:
+            by_file.setdefault(str(issue[file_key]), []).append(issue)
+
+        entries = self.section(name)
+        for key, file_issues in by_file.items():
+            state = self.pending.pop((name, key), None)
+            if state is None:
+                continue
+            entries[key] = dict(state, issues=file_issues)
+
+    def collect_issues(self, name, file_paths):
+        """Issues секции в порядке переданного списка файлов"""
+        entries = self.section(name)
+        issues = []
+        for file_path in file_paths:
+            entry = entries.get(str(file_path))
+            if entry:
+                issues.extend(entry["issues"])
+        return issues
+
+    def cached_check(self, name, input_paths, check):
+        """Повторяет проектную проверку, только если изменились ее входные файлы"""
+        fingerprint = []
+        for input_path in input_paths:
+            try:
+                state = file_state(input_path)
+                fingerprint.append([str(input_path), state["mtime"], state["size"]])
+            except OSError:
+                fingerprint.append([str(input_path), None, None])
+
+        entry = self.data["project"].get(name)
+        if entry and entry["inputs"] == fingerprint:
+            return entry["issues"]
+
+        issues = check()
+        self.data["project"][name] = {"inputs": fingerprint, "issues": issues}
+        return issues
+
+    def save(self):
+        """Атомарно записывает манифест на диск, доступный только владельцу"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
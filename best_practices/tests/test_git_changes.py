@@ -0,0 +1,85 @@
+import subprocess
+
+import pytest
+
+from git_changes import changed_python_files, export_index_files
+from main import CustomStaticAnalyzer
+
+BARE_EXCEPT = "x = 1\ntry:\n    pass\nexcept:\n    pass\n"
+
+
+def git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+    root = tmp_path / "repo"
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "mod.py").write_text("a = 1\nb = 2\n")
+    (root / "top.py").write_text("c = 3\n")
+    git(root, "init", "-q")
+    git(root, "add", ".")
+    git(root, "commit", "-q", "-m", "init")
+    return root
+
+
+def test_staged_changes(repo):
+    (repo / "pkg" / "mod.py").write_text("a = 1\nb = 20\nc = 3\n")
+    (repo / "pkg" / "new file.py").write_text("d = 4\n")
+    (repo / "top.py").write_text("c = 30\n")
+    git(repo, "add", "pkg")
+
+    changes = changed_python_files(repo)
+
+    assert changes == {
+        str(repo / "pkg" / "mod.py"): {2, 3},
+        str(repo / "pkg" / "new file.py"): {1},
+    }
+
+
+def test_changes_against_revision(repo):
+    (repo / "top.py").write_text("c = 30\n")
+    (repo / "pkg" / "mod.py").unlink()
+
+    assert changed_python_files(repo, "HEAD") == {str(repo / "top.py"): {1}}
+
+
+def test_changes_are_limited_to_base_path(repo):
+    (repo / "pkg" / "mod.py").write_text("a = 10\nb = 2\n")
+    (repo / "top.py").write_text("c = 30\n")
+
+    assert changed_python_files(repo / "pkg", "HEAD") == {
+        str(repo / "pkg" / "mod.py"): {1}
+    }
+
+
+def test_export_index_files(repo, tmp_path):
+    (repo / "pkg" / "mod.py").write_text("staged = 1\n")
+    git(repo, "add", ".")
+    (repo / "pkg" / "mod.py").write_text("working = 1\n")
+
+    copies = export_index_files(repo, [str(repo / "pkg" / "mod.py")], tmp_path / "out")
+
+    ((copy, original),) = copies.items()
+    assert original == str(repo / "pkg" / "mod.py")
+    with open(copy) as f:
+        assert f.read() == "staged = 1\n"
+
+
+def test_cached_audit_reads_index(repo):
+    (repo / "pkg" / "mod.py").write_text(BARE_EXCEPT)
+    git(repo, "add", ".")
+    # В рабочем дереве другое содержимое, но проверяться должен индекс
+    (repo / "pkg" / "mod.py").write_text("print(1)\n")
+
+    issues = list(CustomStaticAnalyzer(repo, jobs=1).iter_changes(None, True))
+
+    bare = [issue for issue in issues if issue["type"] == "BARE_EXCEPT"]
+    assert [issue["line"] for issue in bare] == [4]
+    assert {str(issue["file_path"]) for issue in issues} == {
+        str(repo / "pkg" / "mod.py")
+    }
@@ -0,0 +1,90 @@
+import os
+
+from manifest import AuditManifest, default_manifest_path
+
+
+def touch_later(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_default_path_is_outside_project(tmp_path):
+    path = default_manifest_path(tmp_path)
+
+    assert not path.is_relative_to(tmp_path)
+    assert path == default_manifest_path(tmp_path / "." / "")
+
+
+def test_changed_files(tmp_path):
+    a = tmp_path / "a.py"
+    b = tmp_path / "b.py"
+    a.write_text("a = 1\n")
+    b.write_text("b = 1\n")
+    manifest = AuditManifest(tmp_path / "manifest.json")
+
+    assert manifest.changed_files("code", [a, b]) == [a, b]
+    manifest.update_files("code", [a, b], [{"file_path": a, "line": 1}], "file_path")
+    assert manifest.changed_files("code", [a, b]) == []
+
+    # Новый mtime без изменения содержимого не считается изменением
+    touch_later(a)
+    b.write_text("b = 2\n")
+    assert manifest.changed_files("code", [a, b]) == [b]
+
+
+def test_issues_survive_save_and_reload(tmp_path):
+    a = tmp_path / "a.py"
+    a.write_text("a = 1\n")
+    path = tmp_path / "cache" / "manifest.json"
+    manifest = AuditManifest(path, fingerprint="v1")
+    manifest.changed_files("code", [a])
+    manifest.update_files("code", [a], [{"file_path": str(a), "line": 1}], "file_path")
+    manifest.save()
+
+    reloaded = AuditManifest(path, fingerprint="v1")
+    assert reloaded.changed_files("code", [a]) == []
+    assert reloaded.collect_issues("code", [a]) == [{"file_path": str(a), "line": 1}]
+    assert os.listdir(path.parent) == ["manifest.json"]
+
+
+def test_other_fingerprint_discards_manifest(tmp_path):
+    a = tmp_path / "a.py"
+    a.write_text("a = 1\n")
+    path = tmp_path / "manifest.json"
+    manifest = AuditManifest(path, fingerprint="v1")
+    manifest.changed_files("code", [a])
+    manifest.update_files("code", [a], [], "file_path")
+    manifest.save()
+
+    assert AuditManifest(path, fingerprint="v2").changed_files("code", [a]) == [a]
+
+
+def test_deleted_files_are_forgotten(tmp_path):
+    a = tmp_path / "a.py"
+    a.write_text("a = 1\n")
+    manifest = AuditManifest(tmp_path / "manifest.json")
+    manifest.changed_files("code", [a])
+    manifest.update_files("code", [a], [{"file_path": str(a)}], "file_path")
+
+    manifest.changed_files("code", [])
+    assert manifest.collect_issues("code", [a]) == []
+
+
+def test_cached_check_reruns_on_input_change(tmp_path):
+    requirements = tmp_path / "requirements.txt"
+    requirements.write_text("flask\n")
+    manifest = AuditManifest(tmp_path / "manifest.json")
+    calls = []
+
+    def check():
+        calls.append(1)
+        return [{"type": "requirements"}]
+
+    inputs = [requirements, tmp_path / "setup.py"]
+    issues = manifest.cached_check("requirements", inputs, check)
+    assert manifest.cached_check("requirements", inputs, check) == issues
+    assert len(calls) == 1
+
+    requirements.write_text("flask\nrequests\n")
+    manifest.cached_check("requirements", inputs, check)
+    assert len(calls) == 2
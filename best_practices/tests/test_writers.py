@@ -0,0 +1,80 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from writers import write_issues
+
+ISSUES = [
+    {
+        "type": "bare_except",
+        "severity": "medium",
+        "message": "Голый except",
+        "suggestion": "Укажите тип исключения",
+        "line": 4,
+        "file_path": Path("/project/pkg/my module.py"),
+    },
+    {"type": "missing_tests", "severity": "low", "message": "Нет тестов"},
+    {
+        "type": "credentials",
+        "severity": "critical",
+        "message": "Пароль",
+        "file": "/elsewhere/settings.py",
+    },
+]
+
+
+def test_jsonl_one_issue_per_line():
+    stream = io.StringIO()
+    assert write_issues(iter(ISSUES), stream, "jsonl") == 3
+
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line)["type"] for line in lines] == [
+        issue["type"] for issue in ISSUES
+    ]
+    assert json.loads(lines[0])["file_path"] == "/project/pkg/my module.py"
+
+
+def test_sarif_report():
+    stream = io.StringIO()
+    assert write_issues(ISSUES, stream, "sarif", "/project") == 3
+
+    sarif = json.loads(stream.getvalue())
+    run = sarif["runs"][0]
+    assert sarif["version"] == "2.1.0"
+    assert run["invocations"] == [{"executionSuccessful": True}]
+    first, second, third = run["results"]
+    assert first["level"] == "warning"
+    assert first["message"]["text"] == "Голый except. Укажите тип исключения"
+    location = first["locations"][0]["physicalLocation"]
+    assert location["artifactLocation"]["uri"] == "pkg/my%20module.py"
+    assert location["region"] == {"startLine": 4}
+    assert "locations" not in second
+    assert second["level"] == "note"
+    assert third["level"] == "error"
+    uri = third["locations"][0]["physicalLocation"]["artifactLocation"]["uri"]
+    assert uri == "file:///elsewhere/settings.py"
+
+
+def test_empty_sarif_is_valid_json():
+    stream = io.StringIO()
+    write_issues([], stream, "sarif")
+
+    assert json.loads(stream.getvalue())["runs"][0]["results"] == []
+
+
+def test_interrupted_sarif_is_marked_failed():
+    def issues():
+        yield ISSUES[0]
+        raise RuntimeError("прервано")
+
+    stream = io.StringIO()
+    with pytest.raises(RuntimeError):
+        write_issues(issues(), stream, "sarif", "/project")
+
+    run = json.loads(stream.getvalue())["runs"][0]
+    assert len(run["results"]) == 1
+    invocation = run["invocations"][0]
+    assert invocation["executionSuccessful"] is False
+    assert "прервано" in invocation["toolExecutionNotifications"][0]["message"]["text"]
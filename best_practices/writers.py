@@ -0,0 +1,116 @@
+import json
+from pathlib import Path
+from urllib.parse import quote
+
+ISSUE_FORMATS = ("jsonl", "sarif")
+FLUSH_EVERY = 100
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_LEVELS = {
+    "critical": "error",
+    "high": "error",
+    "medium": "warning",
+    "warning": "warning",
+    "low": "note",
+    "info": "note",
+}
+
+
+class JsonlIssueWriter:
+    """Пишет issues в поток по одному JSON-объекту на строку"""
+
+    def __init__(self, stream, flush_every=FLUSH_EVERY):
+        self.stream = stream
+        self.flush_every = flush_every
+        self.count = 0
+
+    def write(self, issue):
+        self.stream.write(json.dumps(issue, ensure_ascii=False, default=str))
+        self.stream.write("\n")
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self.stream.flush()
+
+    def close(self):
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SarifIssueWriter(JsonlIssueWriter):
+    """Пишет issues в формате SARIF 2.1.0, не собирая весь отчет в памяти
+
+    Заголовок пишется сразу, результаты - по мере поступления,
+    закрывающие скобки - в close(). Если запись прервана исключением,
+    run помечается executionSuccessful: false, чтобы неполный отчет не
+    выглядел полным.
+    """
+
+    def __init__(self, stream, base_path=None, flush_every=FLUSH_EVERY):
+        super().__init__(stream, flush_every)
+        self.base_path = Path(base_path).resolve() if base_path else None
+        # Открываем массив results внутри единственного run
+        header = json.dumps({"$schema": SARIF_SCHEMA, "version": "2.1.0"})[:-1]
+        tool = json.dumps({"driver": {"name": "best_practices"}})
+        self.stream.write(f'{header}, "runs": [{{"tool": {tool}, "results": [\n')
+
+    def to_uri(self, file_path):
+        """Относительный URI внутри base_path, иначе абсолютный file://"""
+        path = Path(file_path).resolve()
+        if self.base_path and path.is_relative_to(self.base_path):
+            return quote(path.relative_to(self.base_path).as_posix())
+        return path.as_uri()
+
+    def to_result(self, issue):
+        message = issue["message"]
+        if issue.get("suggestion"):
+            message = f"{message}. {issue['suggestion']}"
+        result = {
+            "ruleId": issue["type"],
+            "level": SARIF_LEVELS.get(issue.get("severity"), "warning"),
+            "message": {"text": message},
+        }
+        file_path = issue.get("file_path") or issue.get("file")
+        if file_path:
+            location = {"artifactLocation": {"uri": self.to_uri(file_path)}}
+            if issue.get("line"):
+                location["region"] = {"startLine": issue["line"]}
+            result["locations"] = [{"physicalLocation": location}]
+        return result
+
+    def write(self, issue):
+        if self.count:
+            self.stream.write(",\n")
+        self.stream.write(json.dumps(self.to_result(issue), ensure_ascii=False))
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self.stream.flush()
+
+    def close(self, error=None):
+        """Закрывает results и run; error - исключение, прервавшее запись"""
+        invocation = {"executionSuccessful": error is None}
+        if error is not None:
+            invocation["toolExecutionNotifications"] = [
+                {"level": "error", "message": {"text": repr(error)}}
+            ]
+        invocations = json.dumps([invocation], ensure_ascii=False)
+        self.stream.write(f'\n], "invocations": {invocations}}}]}}\n')
+        super().close()
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close(exc)
+
+
+def write_issues(issues, stream, fmt="jsonl", base_path=None):
+    """Потоково записывает issues в stream, возвращает их количество"""
+    if fmt == "sarif":
+        writer = SarifIssueWriter(stream, base_path)
+    else:
+        writer = JsonlIssueWriter(stream)
+    with writer:
+        for issue in issues:
+            writer.write(issue)
+    return writer.count
@@ -1,96 +1,177 @@
 import os
-import json
-import subprocess
-from flask import Flask, render_template, request, redirect, url_for
-from behoof import load_json, save_json, calculate_md5
+import sys
+from datetime import datetime, timezone
+from flask import Flask, render_template, request, redirect, url_for, jsonify, abort
+from flask import make_response
+from behoof import str_to_md5
+from blob_store import ingest_stream, checkout_blob, UploadTooLarge
+from job_queue import JobQueue
+from reports import REPORT_TOOL, LEGACY_REPORT_TOOL, TOOLS, build_report, upgrade_report
+from fragment_cache import FragmentCache
+
+# Общие модули (shared/) лежат в корне репозитория
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.report_store import ReportStore  # noqa: E402
+from shared.analyzers import run_command, tool_commands  # noqa: E402
 
 
 app = Flask(__name__)
+app.config["JOB_WORKERS"] = int(os.getenv("CHECKER_JOB_WORKERS", "2"))
 UPLOAD_FOLDER = "uploads"
+BLOB_FOLDER = os.path.join(UPLOAD_FOLDER, "blobs")
+WORK_FOLDER = os.path.join(UPLOAD_FOLDER, "work")
+MAX_UPLOAD_SIZE = 2 * 1024 * 1024
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_SIZE + 64 * 1024
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+store = ReportStore()
+if store.is_empty():
+    store.import_json("data")
+jobs = JobQueue(max_workers=app.config["JOB_WORKERS"])
+fragments = FragmentCache()
 
 
-def run_bandit(filepath):
-    result = subprocess.run(
-        ["bandit", "-f", "json", "-r", filepath], capture_output=True, text=True
-    )
-    return result.stdout
+def run_tool(tool, name, cwd):
+    """Запускает анализатор на файле name в папке cwd (shared.analyzers)"""
+    return run_command(tool_commands([name])[tool], cwd)
 
 
-def run_pylint(filepath):
-    result = subprocess.run(
-        ["pylint", filepath, "--output-format=json"], capture_output=True, text=True
-    )
-    return result.stdout
+def analyze_file(key, filepath, name):
+    """Запускает анализаторы и сохраняет разобранный отчет, если его еще нет
 
+    Анализаторы проверяют копию blob под загруженным именем name.
+    """
+    if store.get_report(key, REPORT_TOOL):
+        return
+    with checkout_blob(filepath, name, WORK_FOLDER) as (folder, filename):
+        report = build_report(
+            *(run_tool(tool, filename, folder) for tool in TOOLS), filename=filename
+        )
+    store.set_report(key, REPORT_TOOL, report)
+    fragments.evict(key)
 
-def run_flake8(filepath):
-    result = subprocess.run(
-        ["flake8", filepath, "--format=json"], capture_output=True, text=True
-    )
-    return result.stdout
 
+def log_job_result(job):
+    if job.status == "failed":
+        app.logger.error("Анализ %s завершился ошибкой: %s", job.key, job.error)
+    else:
+        app.logger.info("Анализ %s завершен", job.key)
 
-def load_report(first_key):
-    """Функция для загрузки и преобразования JSON-отчета в удобный формат"""
-    filecheck_dct = load_json("data", "filecheck.json")
-    reports = filecheck_dct[first_key]
-
-    bandit = json.loads(reports["bandit"]) if "bandit" in reports else {}
-    pylint = json.loads(reports["pylint"]) if "pylint" in reports else []
-    flake8 = json.loads(reports["flake8"]) if "flake8" in reports else {}
 
-    return {"bandit": bandit.get("results", []), "pylint": pylint, "flake8": flake8}
+def load_report(first_key):
+    """Загружает готовый отчет; старые отчеты переводятся в новый формат один раз"""
+    report = store.get_report(first_key, REPORT_TOOL)
+    if report is None:
+        reports = store.get_reports(first_key)
+        if not reports:
+            return None
+        if LEGACY_REPORT_TOOL in reports:
+            report = upgrade_report(reports[LEGACY_REPORT_TOOL])
+        else:
+            report = build_report(*(reports.get(tool) for tool in TOOLS))
+        store.set_report(first_key, REPORT_TOOL, report)
+    return report
+
+
+def is_not_modified(etag, last_modified):
+    """Проверяет условные заголовки запроса If-None-Match и If-Modified-Since"""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since:
+        return request.if_modified_since >= http_date_time(last_modified)
+    return False
+
+
+def http_date_time(timestamp):
+    return datetime.fromtimestamp(int(timestamp), tz=timezone.utc)
+
+
+def render_report(key):
+    """HTML-фрагмент отчета из LRU-кеша, при промахе рендерим и кешируем"""
+    version = store.report_version(key)
+    report_html = fragments.get(key, version)
+    if report_html is None:
+        report = load_report(key)
+        if report is None:
+            return None
+        report_html = render_template("_report.html", report=report)
+        fragments.put(key, store.report_version(key), report_html)
+    return report_html
 
 
 @app.route("/", methods=["GET", "POST"])
 def index():
-    files_dct = load_json("data", "files.json", default={})
-    report = None
     filename = None
 
     if request.method == "POST":
         if "file" in request.files:
             file = request.files["file"]
-            if file and file.filename.endswith(".py"):
-
-                filename = os.path.join(UPLOAD_FOLDER, file.filename)
-                file.save(filename)
+            # Имя из формы может содержать путь клиента
+            name = os.path.basename(file.filename.replace("\\", "/")) if file else ""
+            if name.endswith(".py"):
+                try:
+                    key, filename = ingest_stream(
+                        file.stream, BLOB_FOLDER, MAX_UPLOAD_SIZE
+                    )
+                except UploadTooLarge:
+                    abort(413)
 
-                key = calculate_md5(filename)
                 file_info = {
                     "filename": file.filename,
                     "filepath": filename,
                 }
-                files_dct.setdefault(key, file_info)
-                save_json("data", "files.json", files_dct)
-
-                filecheck_dct = load_json("data", "filecheck.json")
-                filecheck_dct.setdefault(key, dict())
-                if not filecheck_dct[key].get("bandit"):
-                    bandit_report = run_bandit(filename)
-                    filecheck_dct[key]["bandit"] = bandit_report
-                if not filecheck_dct[key].get("pylint"):
-                    pylint_report = run_pylint(filename)
-                    filecheck_dct[key]["pylint"] = pylint_report
-                if not filecheck_dct[key].get("flake8"):
-                    flake8_report = run_flake8(filename)
-                    filecheck_dct[key]["flake8"] = flake8_report
-                save_json("data", "filecheck.json", filecheck_dct)
+                store.add_file(key, file_info)
+
+                job = jobs.submit(
+                    key, analyze_file, key, filename, name, callback=log_job_result
+                )
+                if request.accept_mimetypes.best == "application/json":
+                    return jsonify(job.to_dict()), 202
+                return redirect(url_for("index", key=key))
 
     key = request.args.get("key")
-    if key and key in files_dct:
-        report = load_report(key)
+    # Пока файл анализируется или если анализ упал, вместо отчета
+    # показываем статус задачи
+    job = jobs.get_latest(key) if key else None
+    if job is not None and job.status == "done":
+        job = None
+
+    # Страница меняется только вместе со списком файлов или отчетом
+    files_count, files_updated = store.files_version()
+    report_version = store.report_version(key) if key else 0
+    etag = str_to_md5(f"{key}:{report_version}:{files_count}:{files_updated}")
+    last_modified = max(report_version, files_updated)
+    cacheable = request.method == "GET" and job is None
+    if cacheable and is_not_modified(etag, last_modified):
+        response = app.response_class(status=304)
     else:
-        report = None
-
-    return render_template(
-        "index.html",
-        report=report,
-        filename=filename,
-        files=files_dct,
-        selected_key=key,
-    )
+        files_dct = store.get_files()
+        report_html = None
+        if key and key in files_dct and job is None:
+            report_html = render_report(key)
+
+        response = make_response(
+            render_template(
+                "index.html",
+                report_html=report_html,
+                filename=filename,
+                files=files_dct,
+                selected_key=key,
+                job=job,
+            )
+        )
+    if cacheable:
+        response.set_etag(etag)
+        response.last_modified = http_date_time(last_modified)
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Задача не найдена"}), 404
+    return jsonify(job.to_dict())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,70 @@
+import os
+import shutil
+import hashlib
+import tempfile
+from contextlib import contextmanager
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """Загружаемый файл превышает допустимый размер"""
+
+
+def blob_path(blob_dir, key, suffix=".py"):
+    """Путь к blob по md5: blobs/ab/abcdef....py"""
+    return os.path.join(blob_dir, key[:2], f"{key}{suffix}")
+
+
+def ingest_stream(stream, blob_dir, max_size, suffix=".py"):
+    """Сохраняет поток в хранилище, адресуемое по содержимому
+
+    Данные читаются один раз: md5 считается во время записи во временный
+    файл. Если такой blob уже есть, временный файл удаляется и второй копии
+    не появляется. При превышении max_size бросает UploadTooLarge.
+    Возвращает (md5, путь к blob).
+    """
+    os.makedirs(blob_dir, exist_ok=True)
+    md5 = hashlib.md5()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=blob_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLarge(f"Файл больше {max_size} байт")
+                md5.update(chunk)
+                tmp.write(chunk)
+
+        key = md5.hexdigest()
+        path = blob_path(blob_dir, key, suffix)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return key, path
+
+
+@contextmanager
+def checkout_blob(path, name, work_dir):
+    """Временная папка с blob под именем name, удаляется после выхода
+
+    Blob хранится один на md5, а анализаторам нужен файл с загруженным
+    именем: в отчете не видно путей хранилища, а pylint проверяет имя
+    модуля. Файл - жесткая ссылка на blob, если она невозможна - копия.
+    Возвращает (папка, имя файла).
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=work_dir) as folder:
+        target = os.path.join(folder, os.path.basename(name))
+        try:
+            os.link(path, target)
+        except OSError:
+            shutil.copyfile(path, target)
+        yield folder, os.path.basename(name)
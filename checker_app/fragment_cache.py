@@ -0,0 +1,38 @@
+import threading
+from collections import OrderedDict
+
+
+class FragmentCache:
+    """LRU-кеш отрендеренных фрагментов отчетов
+
+    Запись хранится для пары (key, version) и вытесняется при обновлении
+    отчета или при переполнении кеша.
+    """
+
+    def __init__(self, max_items=256):
+        self.max_items = max_items
+        self.lock = threading.Lock()
+        self.items = OrderedDict()
+
+    def get(self, key, version):
+        with self.lock:
+            item = self.items.get(key)
+            if item is None or item[0] != version:
+                return None
+            self.items.move_to_end(key)
+            return item[1]
+
+    def put(self, key, version, value):
+        with self.lock:
+            self.items[key] = (version, value)
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_items:
+                self.items.popitem(last=False)
+
+    def evict(self, key):
+        with self.lock:
+            self.items.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
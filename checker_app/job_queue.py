@@ -0,0 +1,109 @@
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_FINISHED_JOBS = 1000
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """Задача анализа одного файла"""
+
+    def __init__(self, key):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = "queued"
+        self.error = None
+        self.callbacks = []
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "key": self.key,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """Очередь задач анализа с пулом потоков внутри процесса
+
+    Повторная загрузка файла с тем же md5, пока он еще анализируется,
+    присоединяется к уже запущенной задаче. Последняя задача каждого файла
+    хранится и после завершения, чтобы показать ее ошибку.
+    """
+
+    def __init__(self, max_workers=2):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="checker-job"
+        )
+        self.lock = threading.Lock()
+        self.jobs = OrderedDict()
+        self.active = {}
+        self.latest = {}
+
+    def submit(self, key, func, *args, callback=None):
+        """Ставит func(*args) в очередь и возвращает задачу
+
+        callback(job) вызывается после завершения задачи в потоке пула.
+        """
+        with self.lock:
+            job = self.active.get(key)
+            if job is None:
+                job = Job(key)
+                self.jobs[job.id] = job
+                self.active[key] = job
+                self.latest[key] = job
+                self.executor.submit(self._run, job, func, args)
+            if callback:
+                job.callbacks.append(callback)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def get_latest(self, key):
+        """Последняя задача для файла, в том числе завершенная"""
+        with self.lock:
+            return self.latest.get(key)
+
+    def _run(self, job, func, args):
+        job.status = "running"
+        try:
+            func(*args)
+            status, error = "done", None
+        except Exception as e:
+            status, error = "failed", str(e)
+
+        with self.lock:
+            job.status, job.error = status, error
+            job.finished_at = time.time()
+            self.active.pop(job.key, None)
+            callbacks = list(job.callbacks)
+            self._trim_finished()
+
+        for callback in callbacks:
+            try:
+                callback(job)
+            except Exception:
+                logger.exception("Ошибка в обработчике задачи %s", job.id)
+
+    def _trim_finished(self):
+        """Забывает самые старые завершенные задачи сверх MAX_FINISHED_JOBS"""
+        finished = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.status in ("done", "failed")
+        ]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            job = self.jobs.pop(job_id)
+            if self.latest.get(job.key) is job:
+                del self.latest[job.key]
@@ -0,0 +1,112 @@
+import json
+
+# Отчеты прежнего формата хранились под LEGACY_REPORT_TOOL
+REPORT_TOOL = "report_lines"
+LEGACY_REPORT_TOOL = "report"
+TOOLS = ("bandit", "pylint", "flake8")
+PATH_FIELDS = {"bandit": "filename", "pylint": "path", "flake8": "filename"}
+
+
+def parse_output(raw, default):
+    """Разбирает JSON-вывод анализатора, пустой или битый вывод - default"""
+    if not raw:
+        return default
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return default
+
+
+def normalize_bandit(raw):
+    data = parse_output(raw, {})
+    return [
+        {
+            "line": issue.get("line_number"),
+            "filename": issue.get("filename"),
+            "severity": issue.get("issue_severity"),
+            "confidence": issue.get("issue_confidence"),
+            "test_id": issue.get("test_id"),
+            "test_name": issue.get("test_name"),
+            "text": issue.get("issue_text"),
+            "more_info": issue.get("more_info"),
+        }
+        for issue in data.get("results", [])
+    ]
+
+
+def normalize_pylint(raw):
+    data = parse_output(raw, [])
+    return [
+        {
+            "line": issue.get("line"),
+            "path": issue.get("path"),
+            "type": issue.get("type"),
+            "message_id": issue.get("message-id"),
+            "symbol": issue.get("symbol"),
+            "message": issue.get("message"),
+        }
+        for issue in data
+    ]
+
+
+def normalize_flake8(raw):
+    data = parse_output(raw, {})
+    return [
+        {
+            "line": issue.get("line_number"),
+            "filename": issue.get("filename"),
+            "code": issue.get("code"),
+            "text": issue.get("text"),
+        }
+        for issues in data.values()
+        for issue in issues
+    ]
+
+
+def line_sort_key(issue):
+    line = issue.get("line")
+    return (line is None, line or 0)
+
+
+def group_by_line(issues):
+    """Замечания {инструмент: список} по строкам файла
+
+    Возвращает список строк с замечаниями по возрастанию номера:
+    {"line": номер, "bandit": [...], "pylint": [...], "flake8": [...]}.
+    """
+    by_line = {}
+    for tool in TOOLS:
+        for issue in issues.get(tool, []):
+            row = by_line.setdefault(issue.get("line"), {name: [] for name in TOOLS})
+            row[tool].append(issue)
+    return [
+        {"line": line, **row}
+        for line, row in sorted(
+            by_line.items(), key=lambda item: line_sort_key({"line": item[0]})
+        )
+    ]
+
+
+def build_report(bandit_raw, pylint_raw, flake8_raw, filename=None):
+    """Компактный отчет из сырого вывода bandit, pylint и flake8
+
+    В lines - строки с замечаниями, у каждой замечания всех инструментов
+    (group_by_line); шаблон выводит отчет прямо из них. filename заменяет
+    путь к файлу, который анализаторы пишут каждый по-своему (./name,
+    ././name).
+    """
+    issues = {
+        "bandit": normalize_bandit(bandit_raw),
+        "pylint": normalize_pylint(pylint_raw),
+        "flake8": normalize_flake8(flake8_raw),
+    }
+    if filename is not None:
+        for tool, field in PATH_FIELDS.items():
+            for issue in issues[tool]:
+                issue[field] = filename
+    return {"lines": group_by_line(issues)}
+
+
+def upgrade_report(report):
+    """Отчет прежнего формата (списки замечаний по инструментам) по строкам"""
+    return {"lines": group_by_line(report)}
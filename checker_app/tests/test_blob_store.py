@@ -0,0 +1,49 @@
+import io
+import os
+import hashlib
+
+import pytest
+
+from blob_store import UploadTooLarge, blob_path, checkout_blob, ingest_stream
+
+CONTENT = b"import os\n" * 1000
+
+
+def test_ingest_stores_blob_by_md5(tmp_path):
+    key, path = ingest_stream(io.BytesIO(CONTENT), str(tmp_path), len(CONTENT))
+
+    assert key == hashlib.md5(CONTENT).hexdigest()
+    assert path == blob_path(str(tmp_path), key)
+    assert path == os.path.join(str(tmp_path), key[:2], f"{key}.py")
+    with open(path, "rb") as f:
+        assert f.read() == CONTENT
+
+
+def test_same_content_is_stored_once(tmp_path):
+    first = ingest_stream(io.BytesIO(CONTENT), str(tmp_path), len(CONTENT))
+    second = ingest_stream(io.BytesIO(CONTENT), str(tmp_path), len(CONTENT))
+
+    assert first == second
+    stored = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert stored == [f"{first[0]}.py"]
+
+
+def test_too_large_upload_leaves_nothing(tmp_path):
+    with pytest.raises(UploadTooLarge):
+        ingest_stream(io.BytesIO(CONTENT), str(tmp_path), len(CONTENT) - 1)
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_checkout_uses_uploaded_name(tmp_path):
+    _, path = ingest_stream(io.BytesIO(CONTENT), str(tmp_path / "blobs"), 10**6)
+    work_dir = str(tmp_path / "work")
+
+    with checkout_blob(path, "../../dir/upload.py", work_dir) as (folder, name):
+        assert name == "upload.py"
+        assert os.path.dirname(folder) == work_dir
+        with open(os.path.join(folder, name), "rb") as f:
+            assert f.read() == CONTENT
+
+    assert os.listdir(work_dir) == []
+    assert os.path.exists(path)
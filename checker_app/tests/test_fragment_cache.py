@@ -0,0 +1,37 @@
+from fragment_cache import FragmentCache
+
+
+def test_fragment_is_bound_to_version():
+    cache = FragmentCache()
+    cache.put("key", 1, "<p>v1</p>")
+
+    assert cache.get("key", 1) == "<p>v1</p>"
+    assert cache.get("key", 2) is None
+    cache.put("key", 2, "<p>v2</p>")
+    assert cache.get("key", 1) is None
+    assert cache.get("key", 2) == "<p>v2</p>"
+
+
+def test_least_recently_used_is_evicted():
+    cache = FragmentCache(max_items=2)
+    cache.put("a", 1, "a")
+    cache.put("b", 1, "b")
+    cache.get("a", 1)
+    cache.put("c", 1, "c")
+
+    assert cache.get("a", 1) == "a"
+    assert cache.get("b", 1) is None
+    assert cache.get("c", 1) == "c"
+
+
+def test_evict_and_clear():
+    cache = FragmentCache()
+    cache.put("a", 1, "a")
+    cache.put("b", 1, "b")
+
+    cache.evict("a")
+    cache.evict("missing")
+    assert cache.get("a", 1) is None
+    assert cache.get("b", 1) == "b"
+    cache.clear()
+    assert cache.get("b", 1) is None
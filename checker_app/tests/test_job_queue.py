@@ -0,0 +1,97 @@
+import threading
+
+import job_queue
+from job_queue import JobQueue
+
+
+def wait_done(job, timeout=5):
+    done = threading.Event()
+    job.callbacks.append(lambda _: done.set())
+    if job.status in ("done", "failed"):
+        return
+    assert done.wait(timeout)
+
+
+def test_job_runs_and_calls_back():
+    queue = JobQueue(max_workers=1)
+    results = []
+    finished = threading.Event()
+
+    def callback(job):
+        results.append(job.status)
+        finished.set()
+
+    job = queue.submit("key", results.append, "ran", callback=callback)
+
+    assert finished.wait(5)
+    assert results == ["ran", "done"]
+    assert queue.get(job.id).to_dict()["status"] == "done"
+    assert queue.get_latest("key") is job
+
+
+def test_same_key_joins_active_job():
+    queue = JobQueue(max_workers=2)
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+
+    first = queue.submit("key", work)
+    second = queue.submit("key", work)
+    other = queue.submit("other", work)
+    release.set()
+    for job in (first, other):
+        wait_done(job)
+
+    assert first is second
+    assert other is not first
+    assert len(calls) == 2
+
+    third = queue.submit("key", work)
+    wait_done(third)
+    assert third is not first
+    assert queue.get_latest("key") is third
+
+
+def test_failed_job_keeps_error():
+    queue = JobQueue(max_workers=1)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    job = queue.submit("key", fail)
+    wait_done(job)
+
+    assert job.status == "failed"
+    assert job.error == "boom"
+    assert queue.get_latest("key").error == "boom"
+
+
+def test_callback_error_does_not_stop_other_callbacks():
+    queue = JobQueue(max_workers=1)
+    release = threading.Event()
+    finished = threading.Event()
+
+    def broken(job):
+        raise ValueError("callback")
+
+    job = queue.submit("key", release.wait, 5, callback=broken)
+    queue.submit("key", release.wait, 5, callback=lambda _: finished.set())
+    release.set()
+
+    assert finished.wait(5)
+    assert job.status == "done"
+
+
+def test_finished_jobs_are_trimmed(monkeypatch):
+    monkeypatch.setattr(job_queue, "MAX_FINISHED_JOBS", 2)
+    queue = JobQueue(max_workers=1)
+    jobs = [queue.submit(f"key{i}", lambda: None) for i in range(4)]
+    for job in jobs:
+        wait_done(job)
+
+    assert queue.get(jobs[0].id) is None
+    assert queue.get_latest("key0") is None
+    assert queue.get(jobs[-1].id) is jobs[-1]
@@ -0,0 +1,73 @@
+import json
+
+from reports import build_report, group_by_line, upgrade_report
+
+BANDIT = json.dumps(
+    {
+        "results": [
+            {
+                "line_number": 3,
+                "filename": "././upload.py",
+                "issue_severity": "LOW",
+                "issue_confidence": "HIGH",
+                "test_id": "B101",
+                "test_name": "assert_used",
+                "issue_text": "Use of assert detected.",
+                "more_info": "https://bandit.readthedocs.io/",
+            }
+        ]
+    }
+)
+PYLINT = json.dumps(
+    [
+        {"line": 1, "path": "upload.py", "type": "convention", "message-id": "C0114"},
+        {"line": 3, "path": "upload.py", "type": "warning", "message-id": "W0611"},
+    ]
+)
+FLAKE8 = json.dumps(
+    {"./upload.py": [{"line_number": 3, "filename": "./upload.py", "code": "F401"}]}
+)
+
+
+def test_issues_are_grouped_by_line():
+    report = build_report(BANDIT, PYLINT, FLAKE8, filename="upload.py")
+
+    assert [row["line"] for row in report["lines"]] == [1, 3]
+    first, third = report["lines"]
+    assert [issue["message_id"] for issue in first["pylint"]] == ["C0114"]
+    assert first["bandit"] == [] and first["flake8"] == []
+    assert third["bandit"][0]["test_id"] == "B101"
+    assert third["pylint"][0]["message_id"] == "W0611"
+    assert third["flake8"][0]["code"] == "F401"
+
+
+def test_filename_replaces_tool_paths():
+    report = build_report(BANDIT, PYLINT, FLAKE8, filename="upload.py")
+    row = report["lines"][1]
+
+    assert row["bandit"][0]["filename"] == "upload.py"
+    assert row["pylint"][0]["path"] == "upload.py"
+    assert row["flake8"][0]["filename"] == "upload.py"
+
+
+def test_broken_output_gives_empty_report():
+    assert build_report("", "not json", None) == {"lines": []}
+
+
+def test_issues_without_line_go_last():
+    rows = group_by_line({"pylint": [{"line": None}, {"line": 10}, {"line": 2}]})
+    assert [row["line"] for row in rows] == [2, 10, None]
+
+
+def test_upgrade_legacy_report():
+    legacy = {
+        "bandit": [{"line": 5, "test_id": "B105"}],
+        "pylint": [{"line": 5, "message_id": "C0103"}, {"line": 1}],
+        "flake8": [],
+    }
+
+    rows = upgrade_report(legacy)["lines"]
+
+    assert [row["line"] for row in rows] == [1, 5]
+    assert rows[1]["bandit"] == legacy["bandit"]
+    assert len(rows[1]["pylint"]) == 1
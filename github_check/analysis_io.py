@@ -0,0 +1,161 @@
+import gzip
+import json
+import lzma
+
+GZIP_MAGIC = b"\x1f\x8b"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+SUFFIXES = {".gz": "gzip", ".xz": "lzma", ".lzma": "lzma"}
+
+
+def encode(obj):
+    """default для json: объекты с явным to_dict (GitHubRepoInfo, CommitInfo)"""
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+    return to_dict()
+
+
+ENCODER = json.JSONEncoder(default=encode, ensure_ascii=False, separators=(",", ":"))
+
+
+def open_archive(filename, mode="rt", compression=None):
+    """Открывает файл анализа: обычный, gzip или lzma
+
+    При записи сжатие выбирается параметром compression или по расширению
+    (.gz, .xz, .lzma), при чтении - по первым байтам файла.
+    """
+    if "r" in mode:
+        with open(filename, "rb") as f:
+            magic = f.read(len(XZ_MAGIC))
+        if magic.startswith(GZIP_MAGIC):
+            compression = "gzip"
+        elif magic.startswith(XZ_MAGIC):
+            compression = "lzma"
+    elif compression is None:
+        for suffix, name in SUFFIXES.items():
+            if filename.endswith(suffix):
+                compression = name
+
+    if compression == "gzip":
+        return gzip.open(filename, mode, encoding="utf-8")
+    if compression == "lzma":
+        return lzma.open(filename, mode, encoding="utf-8")
+    return open(filename, mode.replace("t", ""), encoding="utf-8")
+
+
+def write_analysis(analysis, stream):
+    """Пишет анализ компактным JSON, не собирая весь текст в памяти
+
+    Списки и словари верхнего уровня пишутся по элементу на строку, прочие
+    значения - одной строкой. Результат - обычный JSON, а построчная
+    раскладка позволяет AnalysisReader читать разделы лениво.
+    """
+    stream.write("{\n")
+    items = list(analysis.items())
+    for index, (key, value) in enumerate(items):
+        end = ",\n" if index < len(items) - 1 else "\n"
+        name = ENCODER.encode(str(key))
+        if isinstance(value, (list, dict)) and value:
+            if isinstance(value, dict):
+                opening, closing = "{", "}"
+                elements = (
+                    f"{ENCODER.encode(str(k))}:{ENCODER.encode(v)}"
+                    for k, v in value.items()
+                )
+            else:
+                opening, closing = "[", "]"
+                elements = (ENCODER.encode(item) for item in value)
+            stream.write(f"{name}:{opening}\n")
+            for position, element in enumerate(elements):
+                stream.write(("," if position else "") + element + "\n")
+            stream.write(closing + end)
+        else:
+            stream.write(f"{name}:{ENCODER.encode(value)}{end}")
+    stream.write("}\n")
+
+
+def save_analysis(analysis, filename, compression=None):
+    with open_archive(filename, "wt", compression) as stream:
+        write_analysis(analysis, stream)
+
+
+def parse_pair(line):
+    """Пара ключ-значение из строки вида "key":value"""
+    ((key, value),) = json.loads("{" + line + "}").items()
+    return key, value
+
+
+class AnalysisReader:
+    """Ленивое чтение файла, записанного write_analysis
+
+    Файл читается построчно при каждом обращении, в память попадает только
+    запрошенный раздел, а iter_section отдает его элементы по одному.
+    Сжатые gzip/lzma файлы распаковываются на лету.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def _sections(self):
+        """(ключ, значение, итератор элементов или None, словарь ли раздел)
+
+        Итератор элементов нужно дочитать до конца перед следующим разделом.
+        """
+        with open_archive(self.filename) as stream:
+            for line in stream:
+                line = line.strip()
+                if line in ("{", "}", ""):
+                    continue
+                if line.endswith(("[", "{")):
+                    is_dict = line[-1] == "{"
+                    key = json.loads(line[:-2])
+                    yield key, None, self._elements(stream, is_dict), is_dict
+                else:
+                    key, value = parse_pair(line.rstrip(","))
+                    yield key, value, None, isinstance(value, dict)
+
+    def _elements(self, stream, is_dict):
+        for line in stream:
+            line = line.strip()
+            if line in ("]", "],", "}", "},"):
+                return
+            line = line.lstrip(",")
+            yield parse_pair(line) if is_dict else json.loads(line)
+
+    def _skip(self, elements):
+        if elements is not None:
+            for _ in elements:
+                pass
+
+    def keys(self):
+        keys = []
+        for key, _, elements, _ in self._sections():
+            keys.append(key)
+            self._skip(elements)
+        return keys
+
+    def iter_section(self, key):
+        """Элементы списка или пары (ключ, значение) словаря по одному"""
+        for name, value, elements, is_dict in self._sections():
+            if name == key:
+                if elements is None:
+                    elements = value.items() if is_dict else value or ()
+                yield from elements
+                return
+            self._skip(elements)
+        raise KeyError(key)
+
+    def __getitem__(self, key):
+        for name, value, elements, is_dict in self._sections():
+            if name != key:
+                self._skip(elements)
+            elif elements is None:
+                return value
+            else:
+                return dict(elements) if is_dict else list(elements)
+        raise KeyError(key)
+
+    def load(self):
+        """Весь файл целиком"""
+        with open_archive(self.filename) as stream:
+            return json.load(stream)
@@ -0,0 +1,116 @@
+import os
+import json
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from gitinfo import GitHubAnalyzer
+from analysis_io import ENCODER
+
+
+def read_urls(path):
+    """URL репозиториев из файла: по одному на строку, # - комментарий"""
+    with open(path, encoding="utf-8") as f:
+        lines = (line.split("#", 1)[0].strip() for line in f)
+        return list(dict.fromkeys(line for line in lines if line))
+
+
+def load_checkpoint(output):
+    """URL, уже успешно обработанные в прошлых запусках
+
+    Контрольная точка - сам JSONL с результатами. Оборванная при аварии
+    последняя строка отрезается, чтобы следующая запись начиналась с новой
+    строки. Репозитории с ошибкой обрабатываются заново.
+    """
+    if not os.path.exists(output):
+        return set()
+
+    with open(output, "rb+") as f:
+        data = f.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            f.truncate(complete)
+
+    done = set()
+    for line in data[:complete].splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if "error" not in record:
+            done.add(record["url"])
+    return done
+
+
+class BatchRunner:
+    """Анализ списка репозиториев в несколько потоков с общим лимитом запросов
+
+    Все потоки используют один GitHubAnalyzer: общий пул соединений,
+    планировщик лимита и кеш ответов. Результат каждого репозитория сразу
+    дописывается строкой в JSONL, поэтому прерванный запуск продолжается
+    с того же места.
+    """
+
+    def __init__(self, output, jobs=4, analyzer=None):
+        self.output = output
+        self.jobs = jobs
+        self.analyzer = analyzer or GitHubAnalyzer()
+        self.lock = threading.Lock()
+
+    def analyze(self, url):
+        try:
+            analysis = self.analyzer.analyze_repository(url)
+        except Exception as e:
+            analysis = {"error": str(e)}
+        finally:
+            # Снимок дерева больше не нужен, не держим его в памяти
+            parsed = self.analyzer.parse_github_url(url)
+            if parsed:
+                self.analyzer.forget_tree(*parsed)
+        return {"url": url, **analysis}
+
+    def write(self, stream, record):
+        line = ENCODER.encode(record)
+        with self.lock:
+            stream.write(line + "\n")
+            stream.flush()
+            os.fsync(stream.fileno())
+
+    def run(self, urls):
+        """Обрабатывает URL, которых еще нет в output; возвращает (успешно, ошибок)"""
+        done = load_checkpoint(self.output)
+        pending = [url for url in urls if url not in done]
+        print(f"Репозиториев: {len(urls)}, уже готово: {len(urls) - len(pending)}")
+
+        succeeded = failed = 0
+        with open(self.output, "a", encoding="utf-8") as stream:
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                futures = [pool.submit(self.analyze, url) for url in pending]
+                for future in as_completed(futures):
+                    record = future.result()
+                    self.write(stream, record)
+                    if "error" in record:
+                        failed += 1
+                        print(f"Ошибка {record['url']}: {record['error']}")
+                    else:
+                        succeeded += 1
+        return succeeded, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Пакетный анализ репозиториев GitHub с продолжением после сбоя"
+    )
+    parser.add_argument("urls", help="файл со списком URL, по одному на строку")
+    parser.add_argument(
+        "-o", "--output", default="github_batch.jsonl", help="файл результатов JSONL"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=4, help="репозиториев одновременно"
+    )
+    args = parser.parse_args()
+
+    runner = BatchRunner(args.output, args.jobs)
+    succeeded, failed = runner.run(read_urls(args.urls))
+    print(f"Готово: {succeeded}, с ошибками: {failed}")
+    print(f"Лимит запросов осталось: {runner.analyzer.rate_limit_remaining}")
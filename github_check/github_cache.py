@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import behoof
+
+CACHE_DIR = os.path.join("data", "github_cache")
+
+
+class ResponseCache:
+    """Дисковый кеш ответов GitHub API для условных запросов
+
+    Для каждого URL хранятся тело ответа, ETag, Last-Modified и Link.
+    Записи без запроса не отдаются: запрос отправляется с If-None-Match, и
+    только ответ 304 (он не расходует лимит) подтверждает запись. Ответы
+    зависят от токена (приватные репозитории, права), поэтому ключ записи -
+    URL вместе с identity, отпечатком токена; сам токен в кеш не пишется.
+    Записи, не использованные дольше max_age, и самые старые записи сверх
+    max_bytes удаляются.
+    """
+
+    def __init__(
+        self,
+        folder: str = CACHE_DIR,
+        max_age: float = 7 * 24 * 3600,
+        max_bytes: int = 100 * 1024 * 1024,
+    ):
+        self.folder = folder
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+        self.size = sum(size for _, _, size in self._entries())
+        self.evict()
+
+    def _path(self, url: str, identity: str) -> str:
+        key = behoof.str_to_md5(f"{identity}:{url}")
+        return os.path.join(self.folder, f"{key}.json")
+
+    def _entries(self):
+        """(путь, время последнего использования, размер) всех записей"""
+        for entry in os.scandir(self.folder):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                yield entry.path, stat.st_mtime, stat.st_size
+
+    def get(self, url: str, identity: str = ""):
+        """Запись для URL и identity или None"""
+        path = self._path(url, identity)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url or entry.get("identity") != identity:
+            return None
+        os.utime(path)
+        return entry
+
+    def request_headers(self, entry) -> dict:
+        """Заголовки условного запроса для записи"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, response_headers, body, identity: str = ""):
+        """Сохраняет ответ, если у него есть ETag или Last-Modified"""
+        entry = {
+            "url": url,
+            "identity": identity,
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+            "link": response_headers.get("Link"),
+            "stored_at": time.time(),
+            "body": body,
+        }
+        if entry["etag"] or entry["last_modified"]:
+            self._write(entry)
+
+    def touch(self, entry):
+        """Ответ 304: запись подтверждена сервером"""
+        self._write({**entry, "stored_at": time.time()})
+
+    def _write(self, entry):
+        path = self._path(entry["url"], entry["identity"])
+        data = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix=".part")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        with self.lock:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            self.size += os.path.getsize(path) - old_size
+            overflow = self.size > self.max_bytes
+        if overflow:
+            self.evict()
+
+    def evict(self):
+        """Удаляет устаревшие записи и самые давно использованные сверх max_bytes"""
+        with self.lock:
+            now = time.time()
+            entries = sorted(self._entries(), key=lambda item: item[1])
+            total = sum(size for _, _, size in entries)
+            for path, used_at, size in entries:
+                if now - used_at <= self.max_age and total <= self.max_bytes:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+            self.size = total
+
+    def clear(self):
+        with self.lock:
+            for path, _, _ in list(self._entries()):
+                os.remove(path)
+            self.size = 0
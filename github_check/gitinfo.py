@@ -1,18 +1,26 @@
 import requests
 import os
 from dotenv import load_dotenv
-from typing import Dict, List, Optional, Any
-import time
+from typing import Dict, Iterator, List, Optional, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from urllib.parse import urlparse
-import json
+from itertools import islice
+from urllib.parse import urlparse, quote, urlencode
 import behoof
+from github_cache import ResponseCache
+from rate_limiter import RateLimiter
+import repo_archive
+from analysis_io import save_analysis
+
+MAX_RETRIES = 4
+COMMITS_STATE_DIR = os.path.join("data", "github_commits")
 
 
 load_dotenv()
 
 
-@dataclass
+@dataclass(slots=True)
 class GitHubRepoInfo:
     """Класс для хранения информации о репозитории"""
 
@@ -25,8 +33,20 @@ class GitHubRepoInfo:
     created_at: str
     updated_at: str
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "owner": self.owner,
+            "repo": self.repo,
+            "url": self.url,
+            "description": self.description,
+            "stars": self.stars,
+            "forks": self.forks,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
 
-@dataclass
+
+@dataclass(slots=True)
 class CommitInfo:
     """Класс для хранения информации о коммите"""
 
@@ -36,49 +56,221 @@ class CommitInfo:
     date: str
     url: str
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sha": self.sha,
+            "author": self.author,
+            "message": self.message,
+            "date": self.date,
+            "url": self.url,
+        }
+
+
+def commit_from_api(commit_data: Dict) -> CommitInfo:
+    """CommitInfo из элемента ответа /commits"""
+    commit = commit_data["commit"]
+    author = commit["author"]["name"] if commit.get("author") else "Unknown"
+    return CommitInfo(
+        sha=commit_data["sha"][:7],
+        author=author,
+        message=commit["message"].split("\n")[0],  # Первая строка сообщения
+        date=commit["author"]["date"] if commit.get("author") else "",
+        url=commit_data["html_url"],
+    )
+
+
+def next_page_url(link_header: Optional[str]) -> Optional[str]:
+    """Ссылка rel="next" из заголовка Link"""
+    if not link_header:
+        return None
+    for link in requests.utils.parse_header_links(link_header):
+        if link.get("rel") == "next":
+            return link["url"]
+    return None
+
+
+def build_listing(tree: List[Dict], download_url) -> Dict[str, List[Dict]]:
+    """Содержимое всех папок по элементам git-дерева в формате get_files_list
+
+    Ключ - путь папки ("" - корень), значение - сначала файлы, потом папки.
+    download_url(path) строит ссылку на содержимое файла.
+    """
+    files = {}
+    folders = {}
+    for entry in tree:
+        folder, name = os.path.split(entry["path"])
+        if entry["type"] == "blob":
+            files.setdefault(folder, []).append(
+                {
+                    "name": name,
+                    "path": entry["path"],
+                    "size": entry.get("size", 0),
+                    "download_url": download_url(entry["path"]),
+                    "type": "file",
+                }
+            )
+        elif entry["type"] == "tree":
+            folders.setdefault(folder, []).append(
+                {"name": name, "path": entry["path"], "type": "dir"}
+            )
+
+    return {
+        folder: files.get(folder, []) + folders.get(folder, [])
+        for folder in {"", *files, *folders}
+    }
+
+
+def walk_listing(listing: Dict[str, List[Dict]], path: str = "") -> List[Dict]:
+    """Все файлы папки path и ее подпапок в порядке обхода"""
+    all_items = []
+
+    def walk(folder: str):
+        for item in listing.get(folder, []):
+            if item["type"] == "dir":
+                # Рекурсивно обходим содержимое папки
+                walk(item["path"])
+            else:
+                all_items.append(item)
+
+    walk(path.strip("/"))
+    return all_items
+
+
+def build_folder_structure(listing: Dict[str, List[Dict]]) -> Dict:
+    """Вложенная структура папок: имя -> подструктура или описание файла"""
+
+    def build_tree(path: str = "") -> Dict:
+        items = listing.get(path, [])
+        tree = {}
+
+        for item in items:
+            if item["type"] == "dir":
+                tree[item["name"]] = build_tree(item["path"])
+            else:
+                tree[item["name"]] = item
+
+        return tree
+
+    return build_tree()
+
+
+def build_analysis(repo_info, commits: List, files: List[Dict]) -> Dict[str, Any]:
+    """Итог анализа: информация, коммиты и статистика по файлам"""
+    # Анализируем типы файлов
+    file_extensions = {}
+    for file in files:
+        if file["type"] == "file":
+            ext = os.path.splitext(file["name"])[1].lower()
+            file_extensions[ext] = file_extensions.get(ext, 0) + 1
+
+    # Группируем файлы по папкам
+    files_by_folder = {}
+    for file in files:
+        folder = os.path.dirname(file["path"])
+        if folder not in files_by_folder:
+            files_by_folder[folder] = []
+        files_by_folder[folder].append(file["name"])
+
+    return {
+        "repository_info": repo_info,
+        "commits": commits,
+        "total_files": len(files),
+        "file_extensions": file_extensions,
+        "files_by_folder": files_by_folder,
+        "recent_commits_count": len(commits),
+        "sample_files": files[:20],  # Первые 20 файлов для примера
+    }
+
 
 class GitHubAnalyzer:
-    def __init__(self):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
         self.token = os.getenv("GITHUB_TOKEN")
         self.headers = {
             "Authorization": f"token {self.token}",
             "Accept": "application/vnd.github.v3+json",
         }
-        self.base_url = "https://api.github.com"
-        self.rate_limit_remaining = 30
-        self.rate_limit_reset = 0
-
-    def _check_rate_limit(self):
-        """Проверка и обработка лимита запросов"""
-        if self.rate_limit_remaining <= 5:
-            wait_time = max(self.rate_limit_reset - time.time(), 0) + 1
-            print(f"Достигнут лимит запросов. Ожидание {wait_time:.0f} секунд...")
-            time.sleep(wait_time)
-            self._update_rate_limit()
-
-    def _update_rate_limit(self):
-        """Обновление информации о лимите запросов"""
-        try:
-            response = requests.get(f"{self.base_url}/rate_limit", headers=self.headers)
-            if response.status_code == 200:
-                rate_data = response.json()["resources"]["core"]
-                self.rate_limit_remaining = rate_data["remaining"]
-                self.rate_limit_reset = rate_data["reset"]
-        except Exception as e:
-            print(f"Ошибка при проверке лимита: {e}")
+        # Адрес API можно переопределить, например локальной заглушкой
+        self.base_url = base_url or os.getenv(
+            "GITHUB_API_URL", "https://api.github.com"
+        )
+        self.raw_url = os.getenv(
+            "GITHUB_RAW_URL", "https://raw.githubusercontent.com"
+        )
+        # Общий планировщик позволяет нескольким анализаторам делить лимит
+        self.rate_limiter = rate_limiter or RateLimiter()
+
+        # Одна сессия с keep-alive на все запросы, не больше max_workers
+        # одновременных запросов
+        self.max_workers = int(os.getenv("GITHUB_MAX_WORKERS", "8"))
+        self.request_slots = threading.BoundedSemaphore(self.max_workers)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.max_workers, pool_maxsize=self.max_workers
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Кеш ответов для условных запросов, GITHUB_CACHE=0 отключает его.
+        # Записи разных токенов не смешиваются: ключ включает отпечаток токена
+        if cache is None and os.getenv("GITHUB_CACHE", "1") != "0":
+            cache = ResponseCache()
+        self.cache = cache
+        self.cache_identity = behoof.str_to_md5(f"token {self.token}")
+
+        # Снимки деревьев репозиториев: (owner, repo, ref) -> папка -> элементы
+        self.tree_snapshots = {}
+        self.snapshot_locks = {}
+        self.snapshot_lock = threading.Lock()
+
+    @property
+    def rate_limit_remaining(self) -> Optional[int]:
+        return self.rate_limiter.remaining
 
     def _make_request(self, url: str) -> Optional[Dict]:
         """Выполнение запроса к GitHub API"""
-        self._check_rate_limit()
+        return self._request(url)[0]
+
+    def _request(self, url: str) -> tuple:
+        """Запрос к GitHub API: (данные, ссылка на следующую страницу)
+
+        Для закешированных URL запрос условный (If-None-Match), и при
+        ответе 304 данные берутся из кеша.
+        Запросы идут через планировщик лимита, ответы 403/429 из-за лимита
+        повторяются с паузой.
+        """
+        entry = self.cache.get(url, self.cache_identity) if self.cache else None
+        headers = self.cache.request_headers(entry) if entry else {}
+
         try:
-            response = requests.get(url, headers=self.headers)
-            self.rate_limit_remaining = int(
-                response.headers.get("X-RateLimit-Remaining", 30)
-            )
-            self.rate_limit_reset = int(response.headers.get("X-RateLimit-Reset", 0))
+            for attempt in range(MAX_RETRIES + 1):
+                self.rate_limiter.acquire()
+                with self.request_slots:
+                    response = self.session.get(url, headers=headers)
+                if attempt == MAX_RETRIES or not self.rate_limiter.is_limited(
+                    response
+                ):
+                    break
+                wait_time = self.rate_limiter.backoff(response, attempt)
+                print(f"Лимит запросов, повтор через {wait_time:.0f} секунд...")
+
+            if response.status_code == 304 and entry:
+                # 304 не расходует лимит, возвращаем списанный запрос
+                self.rate_limiter.release()
+                self.cache.touch(entry)
+                return entry["body"], next_page_url(entry.get("link"))
+            self.rate_limiter.update(response.headers)
 
             if response.status_code == 200:
-                return response.json()
+                data = response.json()
+                if self.cache:
+                    self.cache.put(url, response.headers, data, self.cache_identity)
+                return data, next_page_url(response.headers.get("Link"))
             elif response.status_code == 404:
                 print("Репозиторий не найден")
             elif response.status_code == 403:
@@ -87,7 +279,14 @@ class GitHubAnalyzer:
                 print(f"Ошибка API: {response.status_code} - {response.text}")
         except Exception as e:
             print(f"Ошибка запроса: {e}")
-        return None
+        return None, None
+
+    def fetch_all(self, urls: List[str]) -> List[Optional[Dict]]:
+        """Параллельное выполнение независимых запросов, порядок сохраняется"""
+        if len(urls) <= 1:
+            return [self._make_request(url) for url in urls]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(self._make_request, urls))
 
     def parse_github_url(self, url: str) -> Optional[tuple]:
         """Парсинг URL репозитория GitHub"""
@@ -145,66 +344,133 @@ class GitHubAnalyzer:
 
         return files + folders
 
+    def get_tree(
+        self, owner: str, repo: str, ref: str = "HEAD"
+    ) -> Optional[List[Dict]]:
+        """Все элементы дерева репозитория через git trees API
+
+        Обычно хватает одного запроса с recursive=1. Если GitHub обрезал
+        ответ (truncated), обходим поддеревья по одному запросу на папку.
+        None - дерево получить не удалось.
+        """
+        url = f"{self.base_url}/repos/{owner}/{repo}/git/trees/{ref}?recursive=1"
+        data = self._make_request(url)
+        if not data:
+            return None
+        if not data.get("truncated"):
+            return data.get("tree", [])
+        print("Дерево репозитория обрезано, обходим папки по одной...")
+        return self._walk_tree(owner, repo, data["sha"])
+
+    def _walk_tree(self, owner: str, repo: str, sha: str) -> List[Dict]:
+        """Обход дерева без recursive=1 по уровням, папки уровня - параллельно"""
+        entries = []
+        level = [(sha, "")]
+        while level:
+            urls = [
+                f"{self.base_url}/repos/{owner}/{repo}/git/trees/{tree_sha}"
+                for tree_sha, _ in level
+            ]
+            next_level = []
+            for (_, prefix), data in zip(level, self.fetch_all(urls)):
+                for entry in (data or {}).get("tree", []):
+                    entry = {**entry, "path": prefix + entry["path"]}
+                    entries.append(entry)
+                    if entry["type"] == "tree":
+                        next_level.append((entry["sha"], entry["path"] + "/"))
+            level = next_level
+        return entries
+
+    def get_tree_listing(
+        self, owner: str, repo: str, ref: str = "HEAD"
+    ) -> Dict[str, List[Dict]]:
+        """Содержимое всех папок репозитория в формате get_files_list
+
+        Ключ - путь папки ("" - корень), значение - сначала файлы, потом папки.
+        Дерево запрашивается один раз на (owner, repo, ref), дальше все
+        методы используют этот снимок.
+        """
+        key = (owner, repo, ref)
+        with self.snapshot_lock:
+            lock = self.snapshot_locks.setdefault(key, threading.Lock())
+        with lock:
+            listing = self.tree_snapshots.get(key)
+            if listing is None:
+                tree = self.get_tree(owner, repo, ref)
+                listing = build_listing(
+                    tree or [],
+                    lambda path: f"{self.raw_url}/{owner}/{repo}/{ref}/{quote(path)}",
+                )
+                if tree is not None:
+                    self.tree_snapshots[key] = listing
+        return listing
+
+    def forget_tree(self, owner: str, repo: str, ref: str = "HEAD"):
+        """Сбрасывает снимок дерева, следующий запрос получит его заново"""
+        with self.snapshot_lock:
+            self.tree_snapshots.pop((owner, repo, ref), None)
+
     def get_all_files_recursive(
-        self, owner: str, repo: str, path: str = ""
+        self, owner: str, repo: str, path: str = "", ref: str = "HEAD"
     ) -> List[Dict]:
         """Рекурсивное получение всех файлов репозитория"""
-        all_items = []
-        current_items = self.get_files_list(owner, repo, path)
-
-        for item in current_items:
-            if item["type"] == "dir":
-                # Рекурсивно получаем содержимое папки
-                sub_items = self.get_all_files_recursive(owner, repo, item["path"])
-                all_items.extend(sub_items)
-            else:
-                all_items.append(item)
-
-        return all_items
+        return walk_listing(self.get_tree_listing(owner, repo, ref), path)
 
     def get_commits_list(
         self, owner: str, repo: str, limit: int = 30
     ) -> List[CommitInfo]:
         """Получение списка коммитов"""
-        url = f"{self.base_url}/repos/{owner}/{repo}/commits?per_page={limit}"
-        data = self._make_request(url)
-
-        commits = []
-        if data and isinstance(data, list):
+        commits = self.iter_commits(owner, repo, per_page=min(limit, 100))
+        return list(islice(commits, limit))
+
+    def iter_commits(
+        self,
+        owner: str,
+        repo: str,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        ref: Optional[str] = None,
+        per_page: int = 100,
+        resume: bool = False,
+    ) -> Iterator[CommitInfo]:
+        """Коммиты от новых к старым, страницы запрашиваются по мере чтения
+
+        Страницы идут по ссылкам rel="next" заголовка Link, since/until -
+        даты ISO 8601. С resume=True выдаются только коммиты новее
+        запомненного в прошлый раз; последний SHA сохраняется, когда
+        генератор прочитан до конца.
+        """
+        params = {"per_page": per_page}
+        for name, value in (("sha", ref), ("since", since), ("until", until)):
+            if value:
+                params[name] = value
+        url = f"{self.base_url}/repos/{owner}/{repo}/commits?{urlencode(params)}"
+
+        state_key = behoof.str_to_md5(f"{owner}/{repo}@{ref or 'HEAD'}")
+        state_file = f"{state_key}.json"
+        last_sha = None
+        if resume:
+            state = behoof.load_json(COMMITS_STATE_DIR, state_file, default={})
+            last_sha = state.get("last_sha")
+
+        newest_sha = None
+        while url:
+            data, url = self._request(url)
+            if not isinstance(data, list):
+                return
             for commit_data in data:
-                commit = commit_data["commit"]
-                author = commit["author"]["name"] if commit.get("author") else "Unknown"
-
-                commits.append(
-                    CommitInfo(
-                        sha=commit_data["sha"][:7],
-                        author=author,
-                        message=commit["message"].split("\n")[
-                            0
-                        ],  # Первая строка сообщения
-                        date=commit["author"]["date"] if commit.get("author") else "",
-                        url=commit_data["html_url"],
-                    )
-                )
-
-        return commits
+                if commit_data["sha"] == last_sha:
+                    url = None
+                    break
+                newest_sha = newest_sha or commit_data["sha"]
+                yield commit_from_api(commit_data)
 
-    def get_folder_structure(self, owner: str, repo: str) -> Dict:
-        """Получение структуры папок репозитория"""
+        if resume and newest_sha:
+            behoof.save_json(COMMITS_STATE_DIR, state_file, {"last_sha": newest_sha})
 
-        def build_tree(path: str = "") -> Dict:
-            items = self.get_files_list(owner, repo, path)
-            tree = {}
-
-            for item in items:
-                if item["type"] == "dir":
-                    tree[item["name"]] = build_tree(item["path"])
-                else:
-                    tree[item["name"]] = item
-
-            return tree
-
-        return build_tree()
+    def get_folder_structure(self, owner: str, repo: str, ref: str = "HEAD") -> Dict:
+        """Получение структуры папок репозитория из снимка дерева"""
+        return build_folder_structure(self.get_tree_listing(owner, repo, ref))
 
     def analyze_repository(self, github_url: str) -> Dict[str, Any]:
         """Полный анализ репозитория"""
@@ -214,62 +480,61 @@ class GitHubAnalyzer:
 
         owner, repo = parsed
         print(f"Анализируем репозиторий: {owner}/{repo}")
-
-        # Получаем основную информацию
-        repo_info = self.get_repo_info(owner, repo)
+        # Свежий снимок дерева на этот анализ, get_folder_structure после
+        # анализа возьмет его же
+        self.forget_tree(owner, repo)
+
+        # Информация, коммиты и файлы не зависят друг от друга
+        print("Получаем информацию, список коммитов и файлов...")
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            repo_info_future = pool.submit(self.get_repo_info, owner, repo)
+            commits_future = pool.submit(self.get_commits_list, owner, repo, 10)
+            files_future = pool.submit(self.get_all_files_recursive, owner, repo)
+
+        repo_info = repo_info_future.result()
         if not repo_info:
             return {"error": "Repository not found"}
+        commits = commits_future.result()
+        files = files_future.result()
 
-        # Получаем коммиты
-        print("Получаем список коммитов...")
-        commits = self.get_commits_list(owner, repo, 10)
-
-        # Получаем файлы
-        print("Получаем список файлов...")
-        files = self.get_all_files_recursive(owner, repo)
-
-        # Анализируем типы файлов
-        file_extensions = {}
-        for file in files:
-            if file["type"] == "file":
-                ext = os.path.splitext(file["name"])[1].lower()
-                file_extensions[ext] = file_extensions.get(ext, 0) + 1
-
-        # Группируем файлы по папкам
-        files_by_folder = {}
-        for file in files:
-            folder = os.path.dirname(file["path"])
-            if folder not in files_by_folder:
-                files_by_folder[folder] = []
-            files_by_folder[folder].append(file["name"])
+        return build_analysis(repo_info, commits, files)
 
+    def check_repository(
+        self, github_url: str, ref: str = "HEAD", jobs: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Проверка .py файлов репозитория статическими анализаторами
+
+        Репозиторий скачивается одним архивом, файлы проверяются локально
+        в дереве с путями репозитория.
+        """
+        parsed = self.parse_github_url(github_url)
+        if not parsed:
+            return {"error": "Invalid GitHub URL"}
+
+        owner, repo = parsed
+        print(f"Скачиваем архив репозитория: {owner}/{repo}")
+        root, files = repo_archive.download_python_files(self, owner, repo, ref)
+        if not files:
+            return {"error": "No Python files found"}
+
+        print(f"Проверяем Python-файлы: {len(files)}")
         return {
-            "repository_info": repo_info,
-            "commits": commits,
-            "total_files": len(files),
-            "file_extensions": file_extensions,
-            "files_by_folder": files_by_folder,
-            "recent_commits_count": len(commits),
-            "sample_files": files[:20],  # Первые 20 файлов для примера
+            "owner": owner,
+            "repo": repo,
+            "ref": ref,
+            "reports": repo_archive.check_python_files(root, files, jobs),
         }
 
-    def save_analysis_to_json(self, analysis_data: Dict, filename: str):
-        """Сохранение результатов анализа в JSON файл"""
-
-        # Конвертируем dataclass объекты в словари
-        def convert_to_serializable(obj):
-            if hasattr(obj, "__dict__"):
-                return obj.__dict__
-            return obj
-
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(
-                analysis_data,
-                f,
-                default=convert_to_serializable,
-                indent=2,
-                ensure_ascii=False,
-            )
+    def save_analysis_to_json(
+        self, analysis_data: Dict, filename: str, compression: Optional[str] = None
+    ):
+        """Сохранение результатов анализа в JSON файл
+
+        Компактный JSON пишется по мере обхода, compression ("gzip", "lzma")
+        или расширение .gz/.xz включают сжатие. Прочитать файл по частям
+        можно через analysis_io.AnalysisReader.
+        """
+        save_analysis(analysis_data, filename, compression)
         print(f"Анализ сохранен в файл: {filename}")
 
 
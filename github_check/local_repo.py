@@ -0,0 +1,167 @@
+import os
+import re
+import subprocess
+from typing import Dict, List, Optional, Any
+from urllib.parse import quote
+
+from gitinfo import (
+    CommitInfo,
+    GitHubRepoInfo,
+    build_analysis,
+    build_folder_structure,
+    build_listing,
+    walk_listing,
+)
+
+GITHUB_REMOTE_RE = re.compile(
+    r"github\.com[:/](?P<owner>[^/]+)/(?P<repo>[^/]+?)(?:\.git)?/?$"
+)
+DATE_FORMAT = "--date=format-local:%Y-%m-%dT%H:%M:%SZ"
+DEFAULT_DESCRIPTION = "Unnamed repository;"
+FIELD_SEP = "\x1f"
+RECORD_SEP = "\x1e"
+
+
+def run_git(args, cwd):
+    # Даты выводим в UTC, как их отдает GitHub API
+    result = subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "TZ": "UTC"},
+    )
+    return result.stdout
+
+
+class LocalRepoAnalyzer:
+    """Анализ локального клона репозитория без обращения к GitHub API
+
+    Результат analyze_repository совпадает по формату с
+    GitHubAnalyzer.analyze_repository. Звезды и форки в клоне неизвестны и
+    равны 0, дата создания - дата первого коммита.
+    """
+
+    def __init__(self, repo_path: str, ref: str = "HEAD"):
+        self.repo_path = os.path.abspath(repo_path)
+        self.ref = ref
+        self.raw_url = os.getenv(
+            "GITHUB_RAW_URL", "https://raw.githubusercontent.com"
+        )
+        self.owner, self.repo, self.html_url = self._parse_remote()
+        self.listing = None
+
+    def _git(self, *args) -> str:
+        return run_git(args, self.repo_path)
+
+    def _parse_remote(self) -> tuple:
+        """owner, repo и ссылка на GitHub по адресу origin"""
+        try:
+            remote = self._git("config", "--get", "remote.origin.url").strip()
+        except subprocess.CalledProcessError:
+            remote = ""
+        match = GITHUB_REMOTE_RE.search(remote)
+        if match:
+            owner, repo = match.group("owner"), match.group("repo")
+            return owner, repo, f"https://github.com/{owner}/{repo}"
+        return "", os.path.basename(self.repo_path), remote
+
+    def _description(self) -> str:
+        git_dir = self._git("rev-parse", "--absolute-git-dir").strip()
+        try:
+            with open(os.path.join(git_dir, "description"), encoding="utf-8") as f:
+                description = f.read().strip()
+        except OSError:
+            return ""
+        return "" if description.startswith(DEFAULT_DESCRIPTION) else description
+
+    def get_repo_info(self) -> Optional[GitHubRepoInfo]:
+        """Основная информация о репозитории из клона"""
+        try:
+            updated_at = self._git("log", "-1", "--format=%cd", DATE_FORMAT, self.ref)
+            root_dates = self._git(
+                "log", "--max-parents=0", "--format=%ad", DATE_FORMAT, self.ref
+            )
+        except subprocess.CalledProcessError:
+            return None
+
+        return GitHubRepoInfo(
+            owner=self.owner,
+            repo=self.repo,
+            url=self.html_url,
+            description=self._description(),
+            stars=0,
+            forks=0,
+            created_at=min(root_dates.split(), default=""),
+            updated_at=updated_at.strip(),
+        )
+
+    def get_commits_list(self, limit: int = 30) -> List[CommitInfo]:
+        """Последние коммиты из git log"""
+        output = self._git(
+            "log",
+            f"-n{limit}",
+            f"--format=%H{FIELD_SEP}%an{FIELD_SEP}%ad{FIELD_SEP}%B{RECORD_SEP}",
+            DATE_FORMAT,
+            self.ref,
+        )
+        commits = []
+        for record in output.split(RECORD_SEP):
+            record = record.strip("\n")
+            if not record:
+                continue
+            sha, author, date, message = record.split(FIELD_SEP, 3)
+            commits.append(
+                CommitInfo(
+                    sha=sha[:7],
+                    author=author or "Unknown",
+                    message=message.split("\n")[0],  # Первая строка сообщения
+                    date=date,
+                    url=f"{self.html_url}/commit/{sha}" if self.owner else "",
+                )
+            )
+        return commits
+
+    def get_tree(self) -> List[Dict]:
+        """Элементы дерева ref в формате git trees API через git ls-tree"""
+        output = self._git("ls-tree", "-r", "-t", "-l", "-z", self.ref)
+        tree = []
+        for record in output.split("\0"):
+            if not record:
+                continue
+            meta, path = record.split("\t", 1)
+            _, kind, sha, size = meta.split()
+            entry = {"path": path, "type": kind, "sha": sha}
+            if kind == "blob":
+                entry["size"] = int(size)
+            tree.append(entry)
+        return tree
+
+    def _download_url(self, path: str) -> Optional[str]:
+        if not self.owner:
+            return None
+        return f"{self.raw_url}/{self.owner}/{self.repo}/{self.ref}/{quote(path)}"
+
+    def get_tree_listing(self) -> Dict[str, List[Dict]]:
+        """Содержимое всех папок, дерево читается один раз"""
+        if self.listing is None:
+            self.listing = build_listing(self.get_tree(), self._download_url)
+        return self.listing
+
+    def get_all_files_recursive(self, path: str = "") -> List[Dict]:
+        return walk_listing(self.get_tree_listing(), path)
+
+    def get_folder_structure(self) -> Dict:
+        return build_folder_structure(self.get_tree_listing())
+
+    def analyze_repository(self) -> Dict[str, Any]:
+        """Полный анализ локального клона"""
+        repo_info = self.get_repo_info()
+        if not repo_info:
+            return {"error": "Repository not found"}
+
+        self.listing = None
+        commits = self.get_commits_list(10)
+        files = self.get_all_files_recursive()
+        return build_analysis(repo_info, commits, files)
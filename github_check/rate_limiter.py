@@ -0,0 +1,122 @@
+import time
+import random
+import threading
+
+MAX_BACKOFF = 60
+
+
+class RateLimiter:
+    """Планировщик запросов к GitHub API по схеме token bucket
+
+    Скорость пополнения считается по заголовкам X-RateLimit-*: оставшиеся
+    запросы (за вычетом reserve) делятся на время до сброса окна, так что
+    запросы равномерно распределяются по окну, а не упираются в лимит в
+    начале часа. Небольшие пачки до burst запросов проходят без ожидания.
+    После ответа о вторичном лимите все потоки ждут Retry-After или растущую
+    паузу. Один экземпляр можно разделить между несколькими анализаторами.
+    """
+
+    def __init__(self, burst: int = 20, reserve: int = 5):
+        self.burst = burst
+        self.reserve = reserve
+        self.lock = threading.Lock()
+        self.limit = None
+        self.remaining = None
+        self.reset = 0
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.pause_until = 0.0
+
+    def _rate(self, now: float) -> float:
+        """Запросов в секунду до конца текущего окна"""
+        if self.remaining is None or now >= self.reset:
+            return float("inf")
+        available = max(self.remaining - self.reserve, 0)
+        return available / max(self.reset - now, 1)
+
+    def _wait_time(self) -> float:
+        """Списывает токен и возвращает 0 или время, которое нужно подождать"""
+        now = time.time()
+        if now < self.pause_until:
+            return self.pause_until - now
+
+        rate = self._rate(now)
+        moment = time.monotonic()
+        if rate == float("inf"):
+            self.tokens = float(self.burst)
+        else:
+            elapsed = moment - self.updated_at
+            self.tokens = min(self.burst, self.tokens + elapsed * rate)
+        self.updated_at = moment
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            if self.remaining is not None:
+                self.remaining -= 1
+            return 0
+        if rate == 0:
+            return max(self.reset - now, 0) + 1
+        return (1 - self.tokens) / rate
+
+    def acquire(self):
+        """Ждет разрешения на один запрос"""
+        while True:
+            with self.lock:
+                wait_time = self._wait_time()
+            if not wait_time:
+                return
+            if wait_time > 5:
+                print(f"Лимит запросов. Ожидание {wait_time:.0f} секунд...")
+            time.sleep(wait_time)
+
+    def release(self):
+        """Возвращает неизрасходованный запрос (например, ответ 304)"""
+        with self.lock:
+            if self.remaining is not None:
+                self.remaining += 1
+
+    def update(self, headers):
+        """Учет лимита по заголовкам ответа
+
+        Ответы параллельных запросов приходят в произвольном порядке: в
+        пределах одного окна берется наименьший остаток.
+        """
+        if "X-RateLimit-Remaining" not in headers:
+            return
+        remaining = int(headers["X-RateLimit-Remaining"])
+        reset = int(headers.get("X-RateLimit-Reset", 0))
+        with self.lock:
+            if "X-RateLimit-Limit" in headers:
+                self.limit = int(headers["X-RateLimit-Limit"])
+            if reset > self.reset or self.remaining is None:
+                self.remaining = remaining
+                self.reset = reset
+            elif reset == self.reset:
+                self.remaining = min(self.remaining, remaining)
+
+    def is_limited(self, response) -> bool:
+        """Ответ 403/429 из-за первичного или вторичного лимита"""
+        if response.status_code == 429:
+            return True
+        if response.status_code != 403:
+            return False
+        return (
+            "Retry-After" in response.headers
+            or response.headers.get("X-RateLimit-Remaining") == "0"
+            or "rate limit" in response.text.lower()
+        )
+
+    def backoff(self, response, attempt: int) -> float:
+        """Пауза для всех потоков после ответа о лимите, возвращает ее длину"""
+        now = time.time()
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            wait_time = int(retry_after)
+        elif response.headers.get("X-RateLimit-Remaining") == "0":
+            reset = int(response.headers.get("X-RateLimit-Reset", 0))
+            wait_time = max(reset - now, 0) + 1
+        else:
+            wait_time = min(2**attempt, MAX_BACKOFF) + random.random()
+        with self.lock:
+            self.pause_until = max(self.pause_until, now + wait_time)
+        return wait_time
@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import tarfile
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Общие модули (shared/) лежат в корне репозитория
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.analyzers import run_tools, tool_versions  # noqa: E402
+
+ARCHIVE_DIR = os.path.join("data", "github_archives")
+REPORT_DIR = os.path.join("data", "github_reports")
+CHUNK_SIZE = 64 * 1024
+CHECK_BATCH_SIZE = 50
+
+
+def report_path(report_dir, key):
+    """Путь к кешу отчета по ключу: reports/ab/abcdef....json"""
+    return os.path.join(report_dir, key[:2], f"{key}.json")
+
+
+def report_keys(files):
+    """Ключи кеша отчетов {путь в репозитории: md5}
+
+    Замечания зависят не только от содержимого файла: pylint разрешает
+    импорты по соседним модулям, имя модуля - по пути, а набор проверок -
+    от версий анализаторов. Поэтому ключ - md5 от версий, путей и md5 всех
+    .py файлов дерева и пути самого файла.
+    """
+    tree = json.dumps([tool_versions(), sorted(files.items())])
+    context = hashlib.md5(tree.encode()).hexdigest()
+    return {
+        path: hashlib.md5(f"{context}:{path}".encode()).hexdigest() for path in files
+    }
+
+
+def safe_member_path(name):
+    """Путь внутри репозитория без первого компонента (owner-repo-sha/)
+
+    None для путей, которые выходят за пределы архива.
+    """
+    path = os.path.normpath(name.split("/", 1)[-1])
+    if os.path.isabs(path) or path == ".." or path.startswith(".." + os.sep):
+        return None
+    return path
+
+
+def extract_member(fileobj, target):
+    """Записывает файл из архива, md5 считается во время записи
+
+    Тот же прием, что в checker_app/blob_store.ingest_stream.
+    """
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    md5 = hashlib.md5()
+    with open(target, "wb") as f:
+        for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+            md5.update(chunk)
+            f.write(chunk)
+    return md5.hexdigest()
+
+
+def extract_python_files(stream, archive_dir=ARCHIVE_DIR):
+    """Извлекает .py файлы из tar-потока с сохранением путей репозитория
+
+    Архив читается последовательно, без сохранения на диск. Файлы
+    раскладываются в archive_dir/<owner-repo-sha>/ так же, как в
+    репозитории, чтобы анализаторы видели пакеты и импорты между модулями.
+    Возвращает (корень дерева, {путь в репозитории: md5}).
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    tmp_root = tempfile.mkdtemp(dir=archive_dir, suffix=".part")
+    top = None
+    files = {}
+    try:
+        with tarfile.open(fileobj=stream, mode="r|*") as tar:
+            for member in tar:
+                top = top or member.name.split("/", 1)[0]
+                if not member.isfile() or not member.name.endswith(".py"):
+                    continue
+                path = safe_member_path(member.name)
+                if path is None:
+                    continue
+                fileobj = tar.extractfile(member)
+                files[path] = extract_member(fileobj, os.path.join(tmp_root, path))
+
+        if top in (None, "", os.curdir, os.pardir):
+            top = "empty"
+        root = os.path.join(archive_dir, top)
+        if os.path.exists(root):
+            shutil.rmtree(root)
+        os.replace(tmp_root, root)
+    except BaseException:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+        raise
+    return root, files
+
+
+def download_python_files(analyzer, owner, repo, ref="HEAD", archive_dir=ARCHIVE_DIR):
+    """Скачивает архив репозитория одним запросом и извлекает .py файлы
+
+    Возвращает (корень дерева, {путь в репозитории: md5}), при ошибке
+    загрузки - (None, {}).
+    """
+    url = f"{analyzer.base_url}/repos/{owner}/{repo}/tarball/{ref}"
+    analyzer.rate_limiter.acquire()
+    with analyzer.request_slots:
+        with analyzer.session.get(url, stream=True) as response:
+            analyzer.rate_limiter.update(response.headers)
+            if response.status_code != 200:
+                print(f"Ошибка загрузки архива: {response.status_code}")
+                return None, {}
+            response.raw.decode_content = True
+            return extract_python_files(response.raw, archive_dir)
+
+
+def check_python_files(root, files, jobs=None, report_dir=REPORT_DIR):
+    """Проверяет извлеченные файлы анализаторами параллельно, пачками
+
+    root и files - результат download_python_files. Анализаторы
+    запускаются из root с путями репозитория (shared.analyzers.run_tools).
+    Отчеты кешируются по report_keys, поэтому повторная проверка того же
+    дерева теми же версиями анализаторов не запускает их снова.
+    Возвращает {путь в репозитории: отчет}.
+    """
+    keys = report_keys(files)
+    reports = {}
+    pending = []
+    for path in sorted(files):
+        try:
+            with open(report_path(report_dir, keys[path]), encoding="utf-8") as f:
+                reports[path] = json.load(f)
+        except (OSError, ValueError):
+            pending.append(path)
+
+    batches = [
+        pending[i : i + CHECK_BATCH_SIZE]
+        for i in range(0, len(pending), CHECK_BATCH_SIZE)
+    ]
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        for batch_reports in pool.map(lambda batch: run_tools(batch, root), batches):
+            for path, report in batch_reports.items():
+                cache_path = report_path(report_dir, keys[path])
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                with open(cache_path, "w", encoding="utf-8") as f:
+                    json.dump(report, f, ensure_ascii=False)
+                reports[path] = report
+
+    return {path: reports[path] for path in files}
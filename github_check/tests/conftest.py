@@ -0,0 +1,70 @@
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+sys.path.insert(0, TESTS_DIR)
+
+import github_stub  # noqa: E402
+from gitinfo import GitHubAnalyzer  # noqa: E402
+
+REPO_FILES = {
+    "README.md": "# demo\n",
+    "setup.py": "from setuptools import setup\n",
+    "pkg/__init__.py": "",
+    "pkg/core.py": "VALUE = 1\n",
+    "pkg/sub/__init__.py": "",
+    "pkg/sub/deep name.py": "DEEP = 2\n",
+    "docs/index.md": "docs\n",
+}
+
+
+@pytest.fixture
+def repo_root(tmp_path):
+    """Папка-репозиторий для заглушки GitHub, больше TRUNCATED_SIZE элементов"""
+    root = tmp_path / "repo"
+    for path, content in REPO_FILES.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(content, encoding="utf-8")
+    return root
+
+
+@pytest.fixture
+def work_dir(tmp_path, monkeypatch):
+    """Отдельная рабочая папка: анализатор пишет состояние в data/"""
+    folder = tmp_path / "work"
+    folder.mkdir()
+    monkeypatch.chdir(folder)
+    monkeypatch.setenv("GITHUB_CACHE", "0")
+    monkeypatch.setenv("GITHUB_TOKEN", "test-token")
+    return folder
+
+
+@pytest.fixture
+def stub_github(repo_root):
+    """Фабрика серверов-заглушек GitHub API, серверы останавливаются после теста"""
+    servers = []
+
+    def start(truncate=False):
+        server = github_stub.serve(str(repo_root), truncate)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def make_analyzer(work_dir):
+    """GitHubAnalyzer для заглушки, по умолчанию без кеша ответов"""
+
+    def make(server, cache=None):
+        analyzer = GitHubAnalyzer(base_url=server.base_url, cache=cache)
+        analyzer.raw_url = github_stub.RAW_URL
+        return analyzer
+
+    return make
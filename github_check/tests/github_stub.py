@@ -0,0 +1,190 @@
+import os
+import json
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, urlencode, parse_qs, quote, unquote
+
+OWNER = "owner"
+REPO = "repo"
+RAW_URL = "https://raw.githubusercontent.com"
+# Сколько элементов оставляет обрезанный ответ recursive=1
+TRUNCATED_SIZE = 5
+
+
+def blob_sha(path):
+    return hashlib.sha1(path.encode()).hexdigest()
+
+
+def list_folder(root, rel):
+    """Элементы папки без .git, по имени"""
+    names = sorted(os.listdir(os.path.join(root, rel)))
+    return [name for name in names if name != ".git"]
+
+
+def tree_entries(root, rel="", recursive=False):
+    """Элементы папки rel в формате git trees API
+
+    Sha папки - "T" + ее путь, по нему сервер отдает поддерево.
+    """
+    entries = []
+    for name in list_folder(root, rel):
+        path = f"{rel}/{name}" if rel else name
+        full_path = os.path.join(root, path)
+        entry_path = path if recursive else name
+        if os.path.isdir(full_path):
+            entries.append({"path": entry_path, "type": "tree", "sha": f"T{path}"})
+            if recursive:
+                entries.extend(tree_entries(root, path, True))
+        else:
+            entries.append(
+                {
+                    "path": entry_path,
+                    "type": "blob",
+                    "sha": blob_sha(path),
+                    "size": os.path.getsize(full_path),
+                }
+            )
+    return entries
+
+
+def contents_items(root, rel):
+    """Элементы папки rel в формате contents API"""
+    items = []
+    for name in list_folder(root, rel):
+        path = f"{rel}/{name}" if rel else name
+        full_path = os.path.join(root, path)
+        if os.path.isdir(full_path):
+            items.append({"name": name, "path": path, "type": "dir"})
+        else:
+            items.append(
+                {
+                    "name": name,
+                    "path": path,
+                    "type": "file",
+                    "size": os.path.getsize(full_path),
+                    "download_url": f"{RAW_URL}/{OWNER}/{REPO}/HEAD/{quote(path)}",
+                }
+            )
+    return items
+
+
+class StubGitHubHandler(BaseHTTPRequestHandler):
+    """Ответы GitHub API для локальной папки как репозитория owner/repo
+
+    Поддерживаются /repos/owner/repo/contents/<path>,
+    /repos/owner/repo/git/trees/<sha>[?recursive=1] и
+    /repos/owner/repo/commits?per_page=&page= - страницы server.commits со
+    ссылкой rel="next" в заголовке Link. При server.truncate
+    ответ recursive=1 обрезается и помечается truncated. У ответов 200 есть
+    ETag, на совпадающий If-None-Match сервер отвечает 304; заголовки
+    запросов сохраняются в server.headers.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, data, status=200, headers=None):
+        body = json.dumps(data).encode()
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(status)
+        if status == 200:
+            self.send_header("ETag", etag)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.server.requests.append(self.path)
+        self.server.headers.append(dict(self.headers))
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        if parts[:3] != ["repos", OWNER, REPO]:
+            return self.send_json({"message": "Not Found"}, 404)
+
+        root = self.server.root
+        rest = parts[3:]
+        if rest[:1] == ["contents"]:
+            rel = "/".join(rest[1:])
+            if not os.path.isdir(os.path.join(root, rel)):
+                return self.send_json({"message": "Not Found"}, 404)
+            return self.send_json(contents_items(root, rel))
+
+        if rest == ["commits"]:
+            return self.send_commits(parse_qs(url.query))
+
+        if rest[:2] == ["git", "trees"]:
+            sha = "/".join(rest[2:])
+            if "recursive" in parse_qs(url.query):
+                tree = tree_entries(root, "", True)
+                if self.server.truncate:
+                    tree = tree[:TRUNCATED_SIZE]
+                return self.send_json(
+                    {"sha": "T", "tree": tree, "truncated": self.server.truncate}
+                )
+            rel = sha[1:] if sha.startswith("T") else ""
+            return self.send_json(
+                {"sha": sha, "tree": tree_entries(root, rel), "truncated": False}
+            )
+
+        return self.send_json({"message": "Not Found"}, 404)
+
+
+    def send_commits(self, query):
+        per_page = int(query.get("per_page", ["30"])[0])
+        page = int(query.get("page", ["1"])[0])
+        commits = self.server.commits
+        start = (page - 1) * per_page
+        headers = {}
+        if start + per_page < len(commits):
+            params = {**{k: v[0] for k, v in query.items()}, "page": page + 1}
+            next_url = f"{self.server.base_url}{urlparse(self.path).path}"
+            headers["Link"] = f'<{next_url}?{urlencode(params)}>; rel="next"'
+        return self.send_json(commits[start : start + per_page], headers=headers)
+
+
+def fake_commit(number):
+    """Элемент ответа /commits; у разных number различаются первые 7 символов sha"""
+    sha = hashlib.sha1(str(number).encode()).hexdigest()
+    return {
+        "sha": sha,
+        "html_url": f"https://github.com/{OWNER}/{REPO}/commit/{sha}",
+        "commit": {
+            "message": f"Commit {number}\n\nDetails",
+            "author": {"name": "Dev", "date": f"2024-01-01T00:00:{number % 60:02}Z"},
+        },
+    }
+
+
+def serve(root, truncate=False):
+    """Запускает сервер-заглушку в фоновом потоке на свободном порту"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGitHubHandler)
+    server.root = root
+    server.truncate = truncate
+    server.requests = []
+    server.headers = []
+    server.commits = []
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    ).start()
+    return server
+
+
+def contents_walk(analyzer, path=""):
+    """Все файлы репозитория прежним обходом contents API, запрос на папку"""
+    files = []
+    for item in analyzer.get_files_list(OWNER, REPO, path):
+        if item["type"] == "file":
+            files.append(item)
+        else:
+            files.extend(contents_walk(analyzer, item["path"]))
+    return files
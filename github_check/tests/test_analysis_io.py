@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from analysis_io import AnalysisReader, save_analysis
+from gitinfo import CommitInfo
+
+ANALYSIS = {
+    "repository_info": {"owner": "owner", "repo": "repo", "stars": 3},
+    "recent_commits": [
+        CommitInfo("abc1234", "Разработчик", "Первый коммит", "2024-01-01", "u1"),
+        CommitInfo("def5678", "Dev", "fix: ] and [", "2024-01-02", "u2"),
+    ],
+    "files_count": 2,
+    "sample_files": [{"path": "a.py"}, {"path": "b/c.py"}],
+    "empty_list": [],
+    "empty_dict": {},
+    "note": "ends with [",
+}
+
+
+def expected():
+    return json.loads(json.dumps(ANALYSIS, default=lambda obj: obj.to_dict()))
+
+
+@pytest.mark.parametrize("name", ["analysis.json", "analysis.json.gz", "analysis.xz"])
+def test_round_trip(tmp_path, name):
+    filename = str(tmp_path / name)
+    save_analysis(ANALYSIS, filename)
+
+    reader = AnalysisReader(filename)
+    assert reader.load() == expected()
+    assert reader.keys() == list(ANALYSIS)
+    for key, value in expected().items():
+        assert reader[key] == value
+
+
+def test_compression_is_detected_by_content(tmp_path):
+    filename = str(tmp_path / "analysis.json")
+    save_analysis(ANALYSIS, filename, compression="gzip")
+
+    with open(filename, "rb") as f:
+        assert f.read(2) == b"\x1f\x8b"
+    assert AnalysisReader(filename).load() == expected()
+
+
+def test_iter_section_yields_items(tmp_path):
+    filename = str(tmp_path / "analysis.json")
+    save_analysis(ANALYSIS, filename)
+    reader = AnalysisReader(filename)
+
+    commits = reader.iter_section("recent_commits")
+    assert next(commits)["sha"] == "abc1234"
+    assert [commit["sha"] for commit in commits] == ["def5678"]
+    assert dict(reader.iter_section("repository_info")) == ANALYSIS["repository_info"]
+    assert list(reader.iter_section("empty_list")) == []
+    with pytest.raises(KeyError):
+        list(reader.iter_section("missing"))
+    with pytest.raises(KeyError):
+        reader["missing"]
+
+
+def test_sections_are_written_one_item_per_line(tmp_path):
+    filename = tmp_path / "analysis.json"
+    save_analysis(ANALYSIS, str(filename))
+
+    lines = filename.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == "{" and lines[-1] == "}"
+    assert '"recent_commits":[' in lines
+    assert "Разработчик" in filename.read_text(encoding="utf-8")
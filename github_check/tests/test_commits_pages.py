@@ -0,0 +1,70 @@
+from itertools import islice
+from urllib.parse import urlparse, parse_qs
+
+from github_stub import OWNER, REPO, fake_commit
+
+
+def short_shas(commits):
+    return [commit["sha"][:7] for commit in commits]
+
+
+def test_commits_follow_link_pages(stub_github, make_analyzer):
+    server = stub_github()
+    server.commits = [fake_commit(i) for i in range(250)]
+
+    commits = list(make_analyzer(server).iter_commits(OWNER, REPO))
+
+    assert [commit.sha for commit in commits] == short_shas(server.commits)
+    assert commits[0].message == "Commit 0"
+    pages = [parse_qs(urlparse(path).query).get("page") for path in server.requests]
+    assert pages == [None, ["2"], ["3"]]
+
+
+def test_commits_are_requested_lazily(stub_github, make_analyzer):
+    server = stub_github()
+    server.commits = [fake_commit(i) for i in range(50)]
+
+    commits = make_analyzer(server).iter_commits(OWNER, REPO, per_page=2)
+    commits = list(islice(commits, 3))
+
+    assert [commit.sha for commit in commits] == short_shas(server.commits[:3])
+    assert len(server.requests) == 2
+
+
+def test_commits_query_parameters(stub_github, make_analyzer):
+    server = stub_github()
+    server.commits = [fake_commit(1)]
+
+    analyzer = make_analyzer(server)
+    list(analyzer.iter_commits(OWNER, REPO, since="2024-01-01", ref="dev"))
+
+    query = parse_qs(urlparse(server.requests[0]).query)
+    assert query == {"per_page": ["100"], "sha": ["dev"], "since": ["2024-01-01"]}
+
+
+def test_resume_returns_only_new_commits(stub_github, make_analyzer):
+    server = stub_github()
+    server.commits = [fake_commit(i) for i in range(150)]
+    analyzer = make_analyzer(server)
+    assert len(list(analyzer.iter_commits(OWNER, REPO, resume=True))) == 150
+
+    new_commits = [fake_commit(i) for i in range(1000, 1003)]
+    server.commits = new_commits + server.commits
+    requests_before = len(server.requests)
+    commits = list(analyzer.iter_commits(OWNER, REPO, resume=True))
+
+    assert [commit.sha for commit in commits] == short_shas(new_commits)
+    # Запомненный коммит на первой странице, следующие не запрашиваются
+    assert len(server.requests) - requests_before == 1
+    assert list(analyzer.iter_commits(OWNER, REPO, resume=True)) == []
+
+
+def test_resume_state_is_saved_after_full_read(stub_github, make_analyzer):
+    server = stub_github()
+    server.commits = [fake_commit(i) for i in range(10)]
+    analyzer = make_analyzer(server)
+
+    list(islice(analyzer.iter_commits(OWNER, REPO, per_page=2, resume=True), 3))
+    commits = list(analyzer.iter_commits(OWNER, REPO, resume=True))
+
+    assert len(commits) == 10
@@ -0,0 +1,78 @@
+import io
+import os
+import tarfile
+
+import repo_archive
+
+INJECTED = '--init-hook=open("PWNED","w").py'
+
+
+def make_tarball(files, top="owner-repo-abc123"):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for path, content in files.items():
+            data = content.encode()
+            info = tarfile.TarInfo(f"{top}/{path}" if top else path)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    buffer.seek(0)
+    return buffer
+
+
+def test_extract_keeps_repository_layout(tmp_path):
+    stream = make_tarball(
+        {
+            "pkg/__init__.py": "",
+            "pkg/mod.py": "import os\n",
+            "README.md": "readme\n",
+            "../escape.py": "x = 1\n",
+        }
+    )
+    root, files = repo_archive.extract_python_files(stream, str(tmp_path))
+
+    assert root == os.path.join(str(tmp_path), "owner-repo-abc123")
+    assert sorted(files) == [
+        os.path.join("pkg", "__init__.py"),
+        os.path.join("pkg", "mod.py"),
+    ]
+    assert os.path.isfile(os.path.join(root, "pkg", "mod.py"))
+    assert not os.path.exists(os.path.join(str(tmp_path), "escape.py"))
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
+
+
+def test_report_keys_depend_on_sibling_files():
+    files = {"a.py": "1" * 32, "b.py": "2" * 32}
+    keys = repo_archive.report_keys(files)
+
+    assert keys["a.py"] != keys["b.py"]
+    assert repo_archive.report_keys(dict(files))["a.py"] == keys["a.py"]
+    changed = repo_archive.report_keys({**files, "b.py": "3" * 32})
+    assert changed["a.py"] != keys["a.py"]
+
+
+def test_check_does_not_treat_file_names_as_options(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stream = make_tarball({INJECTED: "x = 1\n", "ok.py": "import os\n"})
+    root, files = repo_archive.extract_python_files(stream, "archives")
+
+    reports = repo_archive.check_python_files(root, files, report_dir="reports")
+
+    assert not os.path.exists(os.path.join(root, "PWNED"))
+    assert not os.path.exists("PWNED")
+    assert set(reports) == {INJECTED, "ok.py"}
+    symbols = [issue["symbol"] for issue in reports["ok.py"]["pylint"]]
+    assert "unused-import" in symbols
+    assert all(issue["path"] == "ok.py" for issue in reports["ok.py"]["pylint"])
+
+
+def test_check_reuses_cached_reports(tmp_path, monkeypatch):
+    stream = make_tarball({"mod.py": "import os\n"})
+    root, files = repo_archive.extract_python_files(stream, str(tmp_path / "a"))
+    report_dir = str(tmp_path / "reports")
+    first = repo_archive.check_python_files(root, files, report_dir=report_dir)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("анализаторы не должны запускаться")
+
+    monkeypatch.setattr(repo_archive, "run_tools", fail)
+    assert repo_archive.check_python_files(root, files, report_dir=report_dir) == first
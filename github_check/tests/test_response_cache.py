@@ -0,0 +1,86 @@
+import os
+
+from github_cache import ResponseCache
+from github_stub import OWNER, REPO
+
+
+def contents_url(server, path=""):
+    return f"{server.base_url}/repos/{OWNER}/{REPO}/contents/{path}"
+
+
+def test_cached_response_is_revalidated(stub_github, make_analyzer, tmp_path):
+    server = stub_github()
+    cache = ResponseCache(str(tmp_path / "cache"))
+    analyzer = make_analyzer(server, cache)
+    url = contents_url(server)
+
+    first = analyzer._make_request(url)
+    second = analyzer._make_request(url)
+
+    assert second == first
+    # Запись в кеше не отдается без запроса: второй запрос условный
+    assert len(server.requests) == 2
+    assert "If-None-Match" not in server.headers[0]
+    assert server.headers[1]["If-None-Match"] == cache.get(
+        url, analyzer.cache_identity
+    )["etag"]
+
+
+def test_changed_response_replaces_entry(
+    stub_github, make_analyzer, tmp_path, repo_root
+):
+    server = stub_github()
+    cache = ResponseCache(str(tmp_path / "cache"))
+    analyzer = make_analyzer(server, cache)
+    url = contents_url(server)
+
+    before = analyzer._make_request(url)
+    (repo_root / "new.py").write_text("", encoding="utf-8")
+    after = analyzer._make_request(url)
+
+    assert "new.py" not in {item["name"] for item in before}
+    assert "new.py" in {item["name"] for item in after}
+    assert cache.get(url, analyzer.cache_identity)["body"] == after
+
+
+def test_entries_are_separated_by_token(
+    stub_github, make_analyzer, tmp_path, monkeypatch
+):
+    server = stub_github()
+    cache = ResponseCache(str(tmp_path / "cache"))
+    url = contents_url(server)
+
+    first = make_analyzer(server, cache)
+    first._make_request(url)
+    monkeypatch.setenv("GITHUB_TOKEN", "other-token")
+    second = make_analyzer(server, cache)
+    second._make_request(url)
+
+    assert first.cache_identity != second.cache_identity
+    assert "If-None-Match" not in server.headers[1]
+    assert server.headers[1]["Authorization"] == "token other-token"
+    assert len(os.listdir(cache.folder)) == 2
+    for name in os.listdir(cache.folder):
+        with open(os.path.join(cache.folder, name), encoding="utf-8") as f:
+            content = f.read()
+        assert "test-token" not in content and "other-token" not in content
+
+
+def test_response_without_validators_is_not_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put("https://example.test/a", {}, {"a": 1}, "id")
+    cache.put("https://example.test/b", {"ETag": '"b"'}, {"b": 1}, "id")
+
+    assert cache.get("https://example.test/a", "id") is None
+    assert cache.get("https://example.test/b", "id")["body"] == {"b": 1}
+    assert cache.get("https://example.test/b", "other") is None
+
+
+def test_evict_keeps_cache_under_max_bytes(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=1000)
+    for i in range(20):
+        cache.put(f"https://example.test/{i}", {"ETag": f'"{i}"'}, "x" * 100)
+
+    assert cache.size <= 1000
+    assert cache.get("https://example.test/19")["body"] == "x" * 100
+    assert cache.get("https://example.test/0") is None
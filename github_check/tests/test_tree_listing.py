@@ -0,0 +1,65 @@
+import pytest
+
+import github_stub
+from github_stub import OWNER, REPO, TRUNCATED_SIZE
+
+
+def by_path(files):
+    return sorted(files, key=lambda item: item["path"])
+
+
+@pytest.mark.parametrize("truncate", [False, True])
+def test_tree_listing_matches_contents_walk(stub_github, make_analyzer, truncate):
+    server = stub_github(truncate)
+    analyzer = make_analyzer(server)
+
+    tree_files = analyzer.get_all_files_recursive(OWNER, REPO)
+    tree_requests = len(server.requests)
+    contents_files = github_stub.contents_walk(analyzer)
+
+    assert by_path(tree_files) == by_path(contents_files)
+    # Обход contents API - запрос на каждую папку: "", docs, pkg, pkg/sub
+    assert len(server.requests) - tree_requests == 4
+    if not truncate:
+        assert tree_requests == 1
+
+
+def test_truncated_tree_falls_back_to_subtrees(stub_github, make_analyzer, repo_root):
+    server = stub_github(truncate=True)
+    tree = make_analyzer(server).get_tree(OWNER, REPO)
+
+    # Обрезанный ответ плюс запрос на корень и на каждую папку
+    folders = ["", "docs", "pkg", "pkg/sub"]
+    assert len(server.requests) == 1 + len(folders)
+    assert all("recursive" not in path for path in server.requests[1:])
+    assert len(tree) > TRUNCATED_SIZE
+    assert {entry["path"] for entry in tree if entry["type"] == "blob"} == {
+        path.relative_to(repo_root).as_posix()
+        for path in repo_root.rglob("*")
+        if path.is_file()
+    }
+
+
+def test_tree_snapshot_is_requested_once(stub_github, make_analyzer):
+    server = stub_github()
+    analyzer = make_analyzer(server)
+
+    files = analyzer.get_all_files_recursive(OWNER, REPO)
+    structure = analyzer.get_folder_structure(OWNER, REPO)
+    sub_files = analyzer.get_all_files_recursive(OWNER, REPO, "pkg")
+
+    assert len(server.requests) == 1
+    assert "pkg" in structure
+    assert {item["path"] for item in sub_files} == {
+        item["path"] for item in files if item["path"].startswith("pkg/")
+    }
+
+    analyzer.forget_tree(OWNER, REPO)
+    analyzer.get_all_files_recursive(OWNER, REPO)
+    assert len(server.requests) == 2
+
+
+def test_download_url_quotes_path(stub_github, make_analyzer):
+    files = make_analyzer(stub_github()).get_all_files_recursive(OWNER, REPO)
+    urls = {item["path"]: item["download_url"] for item in files}
+    assert urls["pkg/sub/deep name.py"].endswith("/HEAD/pkg/sub/deep%20name.py")
@@ -0,0 +1,5 @@
+"""Модули, общие для checker_app, sheduler_app и github_check
+
+Приложения добавляют корень репозитория в sys.path и импортируют их как
+shared.<модуль>.
+"""
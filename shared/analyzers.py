@@ -0,0 +1,100 @@
+import os
+import json
+import time
+import subprocess
+from functools import lru_cache
+
+TOOLS = ("bandit", "pylint", "flake8")
+
+
+def parse_json_output(raw, default):
+    """Разбирает JSON-вывод анализатора, пустой или битый вывод - default"""
+    try:
+        return json.loads(raw) if raw else default
+    except ValueError:
+        return default
+
+
+def cli_path(path):
+    """Путь файла для командной строки анализатора
+
+    Относительный путь получает префикс ./, иначе имя файла, начинающееся
+    с "-", будет принято за опцию (например, --init-hook у pylint).
+    "--" не помогает: pylint разбирает такие опции и после него.
+    """
+    return path if os.path.isabs(path) else os.path.join(os.curdir, path)
+
+
+def tool_commands(paths, parallel=False):
+    """Команды bandit, pylint и flake8 для списка файлов
+
+    parallel - pylint и flake8 сами распределяют файлы по всем ядрам.
+    """
+    args = [cli_path(path) for path in paths]
+    pylint_jobs = ["--jobs=0"] if parallel else []
+    flake8_jobs = ["--jobs=auto"] if parallel else []
+    return {
+        "bandit": ["bandit", "-f", "json", "-q", "-r", *args],
+        "pylint": ["pylint", *pylint_jobs, "--output-format=json", *args],
+        "flake8": ["flake8", *flake8_jobs, "--format=json", *args],
+    }
+
+
+def run_command(command, cwd=None):
+    result = subprocess.run(command, cwd=cwd, capture_output=True, text=True)
+    return result.stdout
+
+
+@lru_cache(maxsize=None)
+def tool_versions():
+    """Версии анализаторов одной строкой, для ключей кеша отчетов"""
+    return "\n".join(run_command([tool, "--version"]).strip() for tool in TOOLS)
+
+
+def run_tools(paths, cwd=None, parallel=False, timings=None):
+    """Запускает bandit, pylint и flake8 по одному разу на список файлов
+
+    Пути задаются относительно cwd. Вывод раскладывается по файлам:
+    {путь: {инструмент: список замечаний}}, путь в замечаниях заменяется
+    переданным - сами анализаторы пишут его каждый по-своему. У замечаний
+    pylint есть message_id (копия message-id) для шаблонов. В timings
+    накапливается время работы каждого инструмента в секундах.
+    """
+    base = os.path.abspath(cwd or os.curdir)
+    reports = {path: {tool: [] for tool in TOOLS} for path in paths}
+    by_abspath = {os.path.normpath(os.path.join(base, path)): path for path in paths}
+
+    def path_for(reported):
+        if not reported:
+            return None
+        return by_abspath.get(os.path.normpath(os.path.join(base, reported)))
+
+    outputs = {}
+    for tool, command in tool_commands(paths, parallel).items():
+        started = time.perf_counter()
+        outputs[tool] = run_command(command, cwd)
+        if timings is not None:
+            timings[tool] = timings.get(tool, 0) + time.perf_counter() - started
+
+    bandit = parse_json_output(outputs["bandit"], {})
+    for issue in bandit.get("results", []):
+        path = path_for(issue.get("filename"))
+        if path is not None:
+            reports[path]["bandit"].append({**issue, "filename": path})
+
+    for issue in parse_json_output(outputs["pylint"], []):
+        path = path_for(issue.get("path"))
+        if path is not None:
+            reports[path]["pylint"].append(
+                {**issue, "path": path, "message_id": issue.get("message-id")}
+            )
+
+    flake8 = parse_json_output(outputs["flake8"], {})
+    for reported, issues in flake8.items():
+        path = path_for(reported)
+        if path is not None:
+            reports[path]["flake8"].extend(
+                {**issue, "filename": path} for issue in issues
+            )
+
+    return reports
@@ -0,0 +1,215 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from behoof import load_json
+
+DB_PATH = os.path.join("data", "reports.sqlite3")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    key TEXT PRIMARY KEY,
+    info TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reports (
+    key TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    report TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (key, tool)
+);
+CREATE INDEX IF NOT EXISTS reports_tool ON reports (tool);
+CREATE TABLE IF NOT EXISTS view_pages (
+    key TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    rows TEXT NOT NULL,
+    PRIMARY KEY (key, page)
+);
+"""
+
+
+class ReportStore:
+    """Хранилище файлов и отчетов анализаторов на SQLite в режиме WAL
+
+    Отчеты индексируются по md5 содержимого файла (key) и инструменту,
+    каждая запись обновляется отдельно, без перезаписи всего хранилища.
+    Один модуль на checker_app и sheduler_app; постраничная модель
+    отображения (view_pages) пока нужна только sheduler_app.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.local = threading.local()
+        self.conn.executescript(SCHEMA)
+
+    @property
+    def conn(self):
+        """Отдельное соединение на каждый поток"""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Объединяет записи в одну транзакцию, вложенные вызовы используют внешнюю"""
+        conn = self.conn
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def is_empty(self):
+        return self.conn.execute("SELECT 1 FROM files LIMIT 1").fetchone() is None
+
+    def get_files(self):
+        """Словарь key -> информация о файле в порядке добавления"""
+        rows = self.conn.execute("SELECT key, info FROM files ORDER BY rowid")
+        return {key: json.loads(info) for key, info in rows}
+
+    def get_file(self, key):
+        row = self.conn.execute(
+            "SELECT info FROM files WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def add_file(self, key, info):
+        """Добавляет файл, если его еще нет"""
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO files (key, info, updated_at) VALUES (?, ?, ?)",
+                (key, json.dumps(info, ensure_ascii=False), time.time()),
+            )
+
+    def set_file(self, key, info):
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO files (key, info, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET "
+                "info = excluded.info, updated_at = excluded.updated_at",
+                (key, json.dumps(info, ensure_ascii=False), time.time()),
+            )
+
+    def replace_file(self, old_key, new_key, info):
+        """Файл изменился: меняет его key на месте и удаляет старые отчеты
+
+        Если файл с new_key уже есть, старая запись просто удаляется.
+        """
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM reports WHERE key = ?", (old_key,))
+            conn.execute("DELETE FROM view_pages WHERE key = ?", (old_key,))
+            exists = conn.execute(
+                "SELECT 1 FROM files WHERE key = ?", (new_key,)
+            ).fetchone()
+            if exists:
+                conn.execute("DELETE FROM files WHERE key = ?", (old_key,))
+                return
+            conn.execute(
+                "UPDATE files SET key = ?, info = ?, updated_at = ? WHERE key = ?",
+                (new_key, json.dumps(info, ensure_ascii=False), time.time(), old_key),
+            )
+
+    def delete_file(self, key):
+        """Удаляет файл вместе со всеми его отчетами"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM reports WHERE key = ?", (key,))
+            conn.execute("DELETE FROM view_pages WHERE key = ?", (key,))
+            conn.execute("DELETE FROM files WHERE key = ?", (key,))
+
+    def clear(self):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM reports")
+            conn.execute("DELETE FROM view_pages")
+            conn.execute("DELETE FROM files")
+
+    def files_version(self):
+        """Версия списка файлов: количество и время последнего изменения"""
+        count, updated_at = self.conn.execute(
+            "SELECT COUNT(*), MAX(updated_at) FROM files"
+        ).fetchone()
+        return count, updated_at or 0
+
+    def report_version(self, key):
+        """Время последнего обновления отчетов файла, 0 - отчетов нет"""
+        row = self.conn.execute(
+            "SELECT MAX(updated_at) FROM reports WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] or 0
+
+    def get_report(self, key, tool):
+        row = self.conn.execute(
+            "SELECT report FROM reports WHERE key = ? AND tool = ?", (key, tool)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_reports(self, key):
+        """Все отчеты файла: tool -> report"""
+        rows = self.conn.execute(
+            "SELECT tool, report FROM reports WHERE key = ? ORDER BY rowid", (key,)
+        )
+        return {tool: json.loads(report) for tool, report in rows}
+
+    def set_report(self, key, tool, report):
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO reports (key, tool, report, updated_at) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key, tool) DO UPDATE SET "
+                "report = excluded.report, updated_at = excluded.updated_at",
+                (key, tool, json.dumps(report, ensure_ascii=False), time.time()),
+            )
+
+    def set_reports(self, key, reports):
+        """Записывает отчеты всех инструментов файла одной транзакцией"""
+        with self.transaction():
+            for tool, report in reports.items():
+                self.set_report(key, tool, report)
+
+    def set_view(self, key, tool, summary, pages):
+        """Сохраняет готовую для отображения модель отчета
+
+        summary записывается как отчет инструмента tool, строки таблицы -
+        постранично в view_pages (страницы с 1).
+        """
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM view_pages WHERE key = ?", (key,))
+            conn.executemany(
+                "INSERT INTO view_pages (key, page, rows) VALUES (?, ?, ?)",
+                [
+                    (key, page, json.dumps(rows, ensure_ascii=False))
+                    for page, rows in enumerate(pages, start=1)
+                ],
+            )
+            self.set_report(key, tool, summary)
+
+    def get_view_page(self, key, page):
+        """Строки одной страницы модели отчета, [] - страницы нет"""
+        row = self.conn.execute(
+            "SELECT rows FROM view_pages WHERE key = ? AND page = ?", (key, page)
+        ).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def import_json(self, folder="data"):
+        """Переносит данные из старых files.json и filecheck.json"""
+        if not os.path.exists(os.path.join(folder, "files.json")):
+            return 0
+        files_dct = load_json(folder, "files.json", default={})
+        filecheck_dct = load_json(folder, "filecheck.json", default={})
+        with self.transaction():
+            for key, info in files_dct.items():
+                self.set_file(key, info)
+            for key, reports in filecheck_dct.items():
+                self.set_reports(key, reports)
+        return len(files_dct)
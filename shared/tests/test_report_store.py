@@ -0,0 +1,117 @@
+import json
+import threading
+
+import pytest
+
+from shared.report_store import ReportStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReportStore(str(tmp_path / "reports.sqlite3"))
+
+
+def test_files_keep_insertion_order(store):
+    assert store.is_empty()
+    store.add_file("b", {"filename": "b.py"})
+    store.add_file("a", {"filename": "a.py"})
+    store.add_file("b", {"filename": "ignored.py"})
+
+    assert list(store.get_files()) == ["b", "a"]
+    assert store.get_file("b") == {"filename": "b.py"}
+    store.set_file("b", {"filename": "renamed.py"})
+    assert store.get_file("b") == {"filename": "renamed.py"}
+    assert store.files_version()[0] == 2
+
+
+def test_reports_by_tool(store):
+    assert store.report_version("key") == 0
+    store.set_reports("key", {"pylint": [1], "flake8": {"a": []}})
+    store.set_report("key", "pylint", [2])
+
+    assert store.get_report("key", "pylint") == [2]
+    assert store.get_report("key", "bandit") is None
+    assert store.get_reports("key") == {"pylint": [2], "flake8": {"a": []}}
+    assert store.report_version("key") > 0
+
+
+def test_replace_file_moves_key_and_drops_reports(store):
+    store.add_file("old", {"filename": "a.py"})
+    store.set_report("old", "pylint", [])
+    store.set_view("old", "summary", {"total": 1}, [[{"line": 1}]])
+
+    store.replace_file("old", "new", {"filename": "a.py", "md5": "new"})
+
+    assert list(store.get_files()) == ["new"]
+    assert store.get_reports("old") == {}
+    assert store.get_view_page("old", 1) == []
+
+
+def test_replace_file_with_existing_key(store):
+    store.add_file("old", {"filename": "a.py"})
+    store.add_file("new", {"filename": "b.py"})
+
+    store.replace_file("old", "new", {"filename": "a.py"})
+
+    assert store.get_files() == {"new": {"filename": "b.py"}}
+
+
+def test_view_pages(store):
+    store.set_view("key", "summary", {"total": 3}, [[1, 2], [3]])
+
+    assert store.get_report("key", "summary") == {"total": 3}
+    assert store.get_view_page("key", 1) == [1, 2]
+    assert store.get_view_page("key", 2) == [3]
+    assert store.get_view_page("key", 3) == []
+    store.set_view("key", "summary", {"total": 1}, [[1]])
+    assert store.get_view_page("key", 2) == []
+
+
+def test_failed_transaction_is_rolled_back(store):
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            store.add_file("key", {})
+            raise RuntimeError
+
+    assert store.is_empty()
+
+
+def test_delete_and_clear(store):
+    store.add_file("a", {})
+    store.add_file("b", {})
+    store.set_report("a", "pylint", [])
+
+    store.delete_file("a")
+    assert list(store.get_files()) == ["b"]
+    assert store.get_reports("a") == {}
+    store.clear()
+    assert store.is_empty()
+
+
+def test_threads_use_own_connections(store):
+    def write(index):
+        store.set_report(f"key{index}", "pylint", [index])
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [store.get_report(f"key{i}", "pylint") for i in range(8)] == [
+        [i] for i in range(8)
+    ]
+
+
+def test_import_json(store, tmp_path):
+    folder = tmp_path / "data"
+    assert store.import_json(str(folder)) == 0
+    assert not folder.exists()
+
+    folder.mkdir()
+    (folder / "files.json").write_text(json.dumps({"key": {"filename": "a.py"}}))
+    (folder / "filecheck.json").write_text(json.dumps({"key": {"pylint": [1]}}))
+
+    assert store.import_json(str(folder)) == 1
+    assert store.get_file("key") == {"filename": "a.py"}
+    assert store.get_report("key", "pylint") == [1]
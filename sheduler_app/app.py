@@ -1,16 +1,37 @@
 """This module contains functions for managing user profiles."""
 
 import os
+import sys
 import json
-import subprocess
+import time
+import threading
+from datetime import datetime, timezone
 from flask import Flask, render_template, request, redirect, url_for, flash
-from behoof import load_json, save_json, calculate_md5
+from flask import Response, make_response, session
+from behoof import calculate_md5, str_to_md5
+from fragment_cache import FragmentCache
+from scan_progress import ScanProgress
+
+# Общие модули (shared/) лежат в корне репозитория
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.report_store import ReportStore  # noqa: E402
+from shared.analyzers import run_tools  # noqa: E402
 
 
 app = Flask(__name__)
 app.secret_key = "your_secret_key_here"
 DATA_DIR = "data"
 os.makedirs(DATA_DIR, exist_ok=True)
+store = ReportStore(os.path.join(DATA_DIR, "reports.sqlite3"))
+if store.is_empty():
+    store.import_json(DATA_DIR)
+fragments = FragmentCache()
+SCAN_BATCH_SIZE = 200
+SCAN_PROGRESS_STEPS = 8
+SSE_INTERVAL = 1
+VIEW_TOOL = "view"
+VIEW_PAGE_SIZE = 500
+scan_progress = ScanProgress()
 exclude_dirs = {
     ".venv",
     "venv",
@@ -23,27 +44,6 @@ exclude_dirs = {
 }
 
 
-def run_bandit(filepath):
-    result = subprocess.run(
-        ["bandit", "-f", "json", "-r", filepath], capture_output=True, text=True
-    )
-    return result.stdout
-
-
-def run_pylint(filepath):
-    result = subprocess.run(
-        ["pylint", filepath, "--output-format=json"], capture_output=True, text=True
-    )
-    return result.stdout
-
-
-def run_flake8(filepath):
-    result = subprocess.run(
-        ["flake8", filepath, "--format=json"], capture_output=True, text=True
-    )
-    return result.stdout
-
-
 def run_filestr(filepath):
     with open(filepath) as f:
         content = f.readlines()
@@ -58,21 +58,101 @@ def run_filestr(filepath):
     return result
 
 
+def build_reports(filepaths, timings=None):
+    """
+    Запускаем каждый анализатор один раз на список файлов
+    (shared.analyzers.run_tools) и добавляем строки файлов.
+    В timings накапливается время работы каждого анализатора в секундах.
+    """
+    reports = run_tools(filepaths, parallel=True, timings=timings)
+    for filepath, report in reports.items():
+        report["filestr"] = run_filestr(filepath)
+    return reports
+
+
 def update_reports_for_file(key, filepath):
     """
     Обновляем ошибки проекта
     """
-    filecheck_dct = load_json("data", "filecheck.json", default={})
-    filecheck_dct[key] = {
-        "bandit": json.loads(run_bandit(filepath)).get("results"),
-        "pylint": json.loads(run_pylint(filepath)),
-        "flake8": json.loads(run_flake8(filepath)).get(filepath),
-        "filestr": run_filestr(filepath),
-    }
-    for pyl in filecheck_dct[key]["pylint"]:
-        pyl["message_id"] = pyl["message-id"]
+    save_reports_batch([(key, build_reports([filepath])[filepath])])
+
+
+def save_reports_batch(batch):
+    """Сохраняет отчеты нескольких файлов и их модели отображения одной транзакцией"""
+    views = [(key, build_view(reports)) for key, reports in batch]
+    with store.transaction():
+        for key, reports in batch:
+            store.set_reports(key, reports)
+        for key, (summary, pages) in views:
+            store.set_view(key, VIEW_TOOL, summary, pages)
+
 
-    save_json("data", "filecheck.json", filecheck_dct)
+def scan_batch(batch, progress=None):
+    """
+    Анализируем пачку файлов одним запуском каждого анализатора
+    и сохраняем отчеты одной транзакцией
+    """
+    display_paths = [info.get("display_path", info["filepath"]) for _, info in batch]
+    if progress:
+        progress.begin_batch(display_paths)
+    timings = {}
+    reports = build_reports([info["filepath"] for _, info in batch], timings)
+    save_reports_batch([(key, reports[info["filepath"]]) for key, info in batch])
+    if progress:
+        progress.finish_batch(display_paths, timings)
+
+
+def scan_project_files(files_dct, progress=None):
+    """
+    Анализируем файлы проекта пачками не больше SCAN_BATCH_SIZE по очереди:
+    pylint и flake8 сами занимают все ядра (--jobs), а пачки нужны для
+    прогресса - их примерно SCAN_PROGRESS_STEPS
+    """
+    items = list(files_dct.items())
+    batch_size = -(-len(items) // SCAN_PROGRESS_STEPS)
+    batch_size = max(1, min(batch_size, SCAN_BATCH_SIZE))
+    for i in range(0, len(items), batch_size):
+        scan_batch(items[i : i + batch_size], progress)
+
+
+def run_project_scan(files_dct):
+    """Фоновое сканирование проекта с обновлением scan_progress"""
+    try:
+        scan_project_files(files_dct, scan_progress)
+    except Exception as e:
+        scan_progress.finish(error=str(e))
+    else:
+        scan_progress.finish()
+
+
+def file_stat(filepath):
+    """mtime и размер файла для быстрой проверки изменений"""
+    st = os.stat(filepath)
+    return {"mtime": st.st_mtime, "size": st.st_size}
+
+
+def find_changed_files(files_dct):
+    """
+    Сверяем файлы с диском: сначала mtime и размер, при расхождении md5.
+    Возвращает (изменившиеся файлы {old_key: (new_key, info)},
+    файлы без изменений содержимого с новым mtime {key: info},
+    ключи удаленных файлов)
+    """
+    changed, touched, deleted = {}, {}, []
+    for key, info in files_dct.items():
+        try:
+            stat = file_stat(info["filepath"])
+        except OSError:
+            deleted.append(key)
+            continue
+        if all(info.get(name) == value for name, value in stat.items()):
+            continue
+        new_key = calculate_md5(info["filepath"])
+        if new_key == key:
+            touched[key] = {**info, **stat}
+        else:
+            changed[key] = (new_key, {**info, **stat})
+    return changed, touched, deleted
 
 
 def scan_python_files(root_dir):
@@ -96,14 +176,196 @@ def scan_python_files(root_dir):
     return py_files
 
 
+def line_severity(bandit, pylint):
+    """Классы рамки и строки таблицы по уверенности bandit и типу pylint"""
+    match (bandit, pylint):
+        case (None, None):
+            border = "border-primary"
+            table = "table-light"
+        case (None, "convention"):
+            border = "border-warning"
+            table = "table-warning"
+        case (None, "warning"):
+            border = "border-warning"
+            table = "table-warning"
+        case (None, "error"):
+            border = "border-danger"
+            table = "table-danger"
+        case (None, "refactor"):
+            border = "border-success"
+            table = "table-success"
+        case ("LOW", "error"):
+            border = "border-danger"
+            table = "table-danger"
+        case ("LOW", "warning"):
+            border = "border-warning"
+            table = "table-warning"
+        case ("LOW", "convention"):
+            border = "border-warning"
+            table = "table-warning"
+        case ("HIGH", "convention"):
+            border = "border-danger"
+            table = "table-danger"
+        case ("HIGH", "warning"):
+            border = "border-danger"
+            table = "table-danger"
+        case ("MEDIUM", None):
+            border = "border-danger"
+            table = "table-danger"
+        case ("HIGH", None):
+            border = "border-danger"
+            table = "table-danger"
+        case ("LOW", None):
+            border = "border-success"
+            table = "table-success"
+        case _:
+            border = "border-secondary"
+            table = "table-secondary"
+    return border, table
+
+
+def build_table(report):
+    """Строки таблицы отчета с классами подсветки и сводка для progress bar"""
+    table_data = []
+    progress_dct = {}
+
+    # Группировка данных по номерам строк и анализаторам
+    grouped = {}
+
+    for analyzer, issues in report.items():
+        for issue in issues:
+            line_num = issue.get("line_number") or issue.get("line") or ""
+            grouped.setdefault(line_num, {}).setdefault(analyzer, dict())
+            grouped[line_num][analyzer] = issue
+
+    # Сортируем номера строк по возрастанию (числа)
+    def line_sort_key(x):
+        try:
+            return int(x)
+        except:
+            return float("inf")  # нечисловые строки в конец
+
+    sorted_lines = sorted(grouped.keys(), key=line_sort_key)
+
+    # Формируем данные для таблицы
+    for line in sorted_lines:
+        bandit = grouped[line].get("bandit", {}).get("issue_confidence", None)
+        pylint = grouped[line].get("pylint", {}).get("type", None)
+
+        border, table = line_severity(bandit, pylint)
+
+        row = {
+            "line": line,
+            "bandit": grouped[line].get("bandit"),
+            "pylint": grouped[line].get("pylint"),
+            "flake8": grouped[line].get("flake8"),
+            "filestr": grouped[line].get("filestr", {}).get("raw"),
+            "border": border,
+            "table": table,
+        }
+        table_data.append(row)
+        progress_dct.setdefault("total", 0)
+        progress_dct.setdefault(border.split("-")[-1], 0)
+        progress_dct[border.split("-")[-1]] += 1
+        progress_dct["total"] += 1
+
+    if not table_data:
+        return table_data, progress_dct
+
+    progress_dct.update(
+        {
+            "primary1": int(
+                progress_dct.get("primary", 0) / progress_dct["total"] * 100
+            ),
+            "warning1": int(
+                progress_dct.get("warning", 0) / progress_dct["total"] * 100
+            ),
+            "danger1": int(
+                progress_dct.get("danger", 0) / progress_dct["total"] * 100
+            ),
+            "secondary1": int(
+                progress_dct.get("secondary", 0) / progress_dct["total"] * 100
+            ),
+            "success1": int(
+                progress_dct.get("success", 0) / progress_dct["total"] * 100
+            ),
+        }
+    )
+
+    return table_data, progress_dct
+
+
+def build_view(reports):
+    """
+    Модель отображения отчета: сводка для progress bar
+    и строки таблицы, разбитые на страницы по VIEW_PAGE_SIZE
+    """
+    report = {tool: issues for tool, issues in reports.items() if tool != VIEW_TOOL}
+    table_data, progress_dct = build_table(report)
+    pages = [
+        table_data[i : i + VIEW_PAGE_SIZE]
+        for i in range(0, len(table_data), VIEW_PAGE_SIZE)
+    ]
+    summary = {
+        "progress": progress_dct,
+        "rows": len(table_data),
+        "pages": max(1, len(pages)),
+    }
+    return summary, pages
+
+
+def get_view_summary(key):
+    """Сводка модели отображения; для старых отчетов без нее строим и сохраняем"""
+    summary = store.get_report(key, VIEW_TOOL)
+    if summary is None:
+        reports = store.get_reports(key)
+        summary, pages = build_view(reports)
+        if reports:
+            store.set_view(key, VIEW_TOOL, summary, pages)
+    return summary
+
+
+def render_report(key, page=1):
+    """
+    HTML страницы таблицы отчета и сводка: чтение готовой модели и рендер,
+    отрендеренные страницы лежат в LRU-кеше
+    """
+    version = store.report_version(key)
+    cached = fragments.get(key, version)
+    if cached is None:
+        cached = {"summary": get_view_summary(key), "pages": {}}
+        version = store.report_version(key)
+    summary = cached["summary"]
+    page = min(max(page, 1), summary["pages"])
+    if page not in cached["pages"]:
+        report_html = render_template(
+            "_report_table.html", table_data=store.get_view_page(key, page)
+        )
+        cached = {**cached, "pages": {**cached["pages"], page: report_html}}
+        fragments.put(key, version, cached)
+    return cached["pages"][page], summary, page
+
+
+def is_not_modified(etag, last_modified):
+    """Проверяет условные заголовки запроса If-None-Match и If-Modified-Since"""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since:
+        return request.if_modified_since >= http_date_time(last_modified)
+    return False
+
+
+def http_date_time(timestamp):
+    return datetime.fromtimestamp(int(timestamp), tz=timezone.utc)
+
+
 @app.route("/", methods=["GET", "POST"])
 def index():
-    files_dct = load_json("data", "files.json", default={})
-    report = None
     selected_key = request.args.get("key")
+    page = request.args.get("page", 1, type=int)
     selected_file_info = None
-    table_data = []
     progress_dct = {}
+    pages = 1
 
     if request.method == "POST":
         project_path = request.form.get("project_path", "").strip()
@@ -112,8 +374,11 @@ def index():
             and os.path.exists(project_path)
             and os.path.isdir(project_path)
         ):
-            save_json("data", "files.json", {})
-            save_json("data", "filecheck.json", {})
+            if scan_progress.snapshot()["status"] == "running":
+                flash("Дождитесь окончания текущего сканирования.", "warning")
+                return redirect(url_for("index"))
+            store.clear()
+            fragments.clear()
             files_dct = {}
             all_py_files = scan_python_files(project_path)
             if not all_py_files:
@@ -132,149 +397,90 @@ def index():
                     "filepath": fp,
                     "display_path": display_path,
                     "project_root": project_path,
+                    **file_stat(fp),
                 }
 
-            save_json("data", "files.json", files_dct)
+            with store.transaction():
+                for key, info in files_dct.items():
+                    store.set_file(key, info)
 
-            for fp in all_py_files:
-                key = calculate_md5(fp)
-                update_reports_for_file(key, fp)
-            msg = f"Проект '{project_path}' загружен. Найдено и проанализировано {len(all_py_files)} Python-файлов."
+            if scan_progress.start(project_path, len(files_dct)):
+                threading.Thread(
+                    target=run_project_scan, args=(files_dct,), daemon=True
+                ).start()
+            msg = f"Проект '{project_path}' загружен. Найдено {len(all_py_files)} Python-файлов, идет анализ."
             flash(msg, "success")
             return redirect(url_for("index"))
         msg = "Пожалуйста, укажите корректный путь к существующей директории."
         flash(msg, "error")
 
-    # Загружаем отчет, если выбран файл
-    if selected_key and selected_key in files_dct:
-        selected_file_info = files_dct[selected_key]
-        filecheck_dct = load_json("data", "filecheck.json", default={})
-        report = filecheck_dct.get(selected_key)
-
-        if report:
-            # Группировка данных по номерам строк и анализаторам
-            grouped = {}
-
-            for analyzer, issues in report.items():
-                for issue in issues:
-                    line_num = issue.get("line_number") or issue.get("line") or ""
-                    grouped.setdefault(line_num, {}).setdefault(analyzer, dict())
-                    grouped[line_num][analyzer] = issue
-
-            # Сортируем номера строк по возрастанию (числа)
-            def line_sort_key(x):
-                try:
-                    return int(x)
-                except:
-                    return float("inf")  # нечисловые строки в конец
-
-            sorted_lines = sorted(grouped.keys(), key=line_sort_key)
-
-            # Формируем данные для таблицы
-            table_data = []
-            for line in sorted_lines:
-                bandit = grouped[line].get("bandit", {}).get("issue_confidence", None)
-                pylint = grouped[line].get("pylint", {}).get("type", None)
-
-                match (bandit, pylint):
-                    case (None, None):
-                        border = "border-primary"
-                        table = "table-light"
-                    case (None, "convention"):
-                        border = "border-warning"
-                        table = "table-warning"
-                    case (None, "warning"):
-                        border = "border-warning"
-                        table = "table-warning"
-                    case (None, "error"):
-                        border = "border-danger"
-                        table = "table-danger"
-                    case (None, "refactor"):
-                        border = "border-success"
-                        table = "table-success"
-                    case ("LOW", "error"):
-                        border = "border-danger"
-                        table = "table-danger"
-                    case ("LOW", "warning"):
-                        border = "border-warning"
-                        table = "table-warning"
-                    case ("LOW", "convention"):
-                        border = "border-warning"
-                        table = "table-warning"
-                    case ("HIGH", "convention"):
-                        border = "border-danger"
-                        table = "table-danger"
-                    case ("HIGH", "warning"):
-                        border = "border-danger"
-                        table = "table-danger"
-                    case ("MEDIUM", None):
-                        border = "border-danger"
-                        table = "table-danger"
-                    case ("HIGH", None):
-                        border = "border-danger"
-                        table = "table-danger"
-                    case ("LOW", None):
-                        border = "border-success"
-                        table = "table-success"
-                    case _:
-                        border = "border-secondary"
-                        table = "table-secondary"
-
-                row = {
-                    "line": line,
-                    "bandit": grouped[line].get("bandit"),
-                    "pylint": grouped[line].get("pylint"),
-                    "flake8": grouped[line].get("flake8"),
-                    "filestr": grouped[line].get("filestr", {}).get("raw"),
-                    "border": border,
-                    "table": table,
-                }
-                table_data.append(row)
-                progress_dct.setdefault("total", 0)
-                progress_dct.setdefault(border.split("-")[-1], 0)
-                progress_dct[border.split("-")[-1]] += 1
-                progress_dct["total"] += 1
-
-            progress_dct.update(
-                {
-                    "primary1": int(
-                        progress_dct.get("primary", 0) / progress_dct["total"] * 100
-                    ),
-                    "warning1": int(
-                        progress_dct.get("warning", 0) / progress_dct["total"] * 100
-                    ),
-                    "danger1": int(
-                        progress_dct.get("danger", 0) / progress_dct["total"] * 100
-                    ),
-                    "secondary1": int(
-                        progress_dct.get("secondary", 0) / progress_dct["total"] * 100
-                    ),
-                    "success1": int(
-                        progress_dct.get("success", 0) / progress_dct["total"] * 100
-                    ),
-                }
-            )
-
+    # Страница меняется только вместе со списком файлов или отчетом,
+    # flash-сообщения показываем всегда
+    files_count, files_updated = store.files_version()
+    report_version = store.report_version(selected_key) if selected_key else 0
+    scan_state = scan_progress.snapshot()
+    etag = str_to_md5(
+        f"{selected_key}:{page}:{report_version}:{files_count}:{files_updated}:"
+        f"{scan_state['status']}"
+    )
+    last_modified = max(report_version, files_updated)
+    cacheable = request.method == "GET" and not session.get("_flashes")
+    if cacheable and is_not_modified(etag, last_modified):
+        response = app.response_class(status=304)
     else:
-        table_data = []
-
-    return render_template(
-        "index.html",
-        files=files_dct,
-        selected_key=selected_key,
-        selected_file_info=selected_file_info,
-        table_data=table_data,
-        progress_dct=progress_dct,
+        files_dct = store.get_files()
+        # Загружаем отчет, если выбран файл
+        report_html = None
+        if selected_key and selected_key in files_dct:
+            selected_file_info = files_dct[selected_key]
+            if report_version:
+                report_html, summary, page = render_report(selected_key, page)
+                progress_dct, pages = summary["progress"], summary["pages"]
+
+        response = make_response(
+            render_template(
+                "index.html",
+                files=files_dct,
+                selected_key=selected_key,
+                selected_file_info=selected_file_info,
+                report_html=report_html,
+                progress_dct=progress_dct,
+                page=page,
+                pages=pages,
+                scan=scan_state,
+            )
+        )
+    if cacheable:
+        response.set_etag(etag)
+        response.last_modified = http_date_time(last_modified)
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@app.route("/scan/progress")
+def scan_progress_stream():
+    """Прогресс сканирования через Server-Sent Events"""
+
+    def stream():
+        while True:
+            state = scan_progress.snapshot()
+            yield f"data: {json.dumps(state, ensure_ascii=False)}\n\n"
+            if state["status"] != "running":
+                break
+            time.sleep(SSE_INTERVAL)
+
+    return Response(
+        stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"}
     )
 
 
 @app.route("/refresh/<key>")
 def refresh(key):
-    files_dct = load_json("data", "files.json", default={})
-    if key in files_dct:
-        filepath = files_dct[key]["filepath"]
-        update_reports_for_file(key, filepath)
-        msg = f"Отчет для '{files_dct[key]['display_path']}' обновлен."
+    file_info = store.get_file(key)
+    if file_info:
+        update_reports_for_file(key, file_info["filepath"])
+        fragments.evict(key)
+        msg = f"Отчет для '{file_info['display_path']}' обновлен."
         flash(msg, "info")
     else:
         flash("Файл не найден.", "error")
@@ -283,12 +489,25 @@ def refresh(key):
 
 @app.route("/refresh-all")
 def refresh_all():
-    files_dct = load_json("data", "files.json", default={})
-    count = 0
-    for key, info in files_dct.items():
-        update_reports_for_file(key, info["filepath"])
-        count += 1
-    flash(f"Обновлено отчетов: {count}", "info")
+    """Переанализирует только изменившиеся файлы, удаленные убирает из списка"""
+    if scan_progress.snapshot()["status"] == "running":
+        flash("Дождитесь окончания текущего сканирования.", "warning")
+        return redirect(url_for("index"))
+
+    changed, touched, deleted = find_changed_files(store.get_files())
+    with store.transaction():
+        for key in deleted:
+            store.delete_file(key)
+        for key, info in touched.items():
+            store.set_file(key, info)
+        for old_key, (new_key, info) in changed.items():
+            store.replace_file(old_key, new_key, info)
+    for key in [*deleted, *changed]:
+        fragments.evict(key)
+
+    scan_project_files({new_key: info for new_key, info in changed.values()})
+    msg = f"Обновлено отчетов: {len(changed)}, удалено файлов: {len(deleted)}"
+    flash(msg, "info")
     return redirect(url_for("index"))
 
 
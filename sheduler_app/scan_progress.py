@@ -0,0 +1,79 @@
+import time
+import threading
+
+
+class ScanProgress:
+    """Состояние фонового сканирования проекта для отображения прогресса
+
+    Все методы потокобезопасны: их вызывают потоки пула сканирования
+    и обработчики запросов.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.status = "idle"
+        self.project_path = None
+        self.total = 0
+        self.done = 0
+        self.current = []
+        self.timings = {}
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+
+    def start(self, project_path, total):
+        """Начинает новое сканирование; False, если предыдущее еще идет"""
+        with self.lock:
+            if self.status == "running":
+                return False
+            self.status = "running"
+            self.project_path = project_path
+            self.total = total
+            self.done = 0
+            self.current = []
+            self.timings = {}
+            self.started_at = time.time()
+            self.finished_at = None
+            self.error = None
+            return True
+
+    def begin_batch(self, paths):
+        with self.lock:
+            self.current.extend(paths)
+
+    def finish_batch(self, paths, timings):
+        with self.lock:
+            self.done += len(paths)
+            for path in paths:
+                self.current.remove(path)
+            for tool, seconds in timings.items():
+                self.timings[tool] = self.timings.get(tool, 0) + seconds
+
+    def finish(self, error=None):
+        with self.lock:
+            self.status = "failed" if error else "done"
+            self.error = error
+            self.current = []
+            self.finished_at = time.time()
+
+    def snapshot(self):
+        """Текущее состояние в виде словаря для JSON/SSE"""
+        with self.lock:
+            elapsed = 0
+            if self.started_at:
+                elapsed = (self.finished_at or time.time()) - self.started_at
+            eta = None
+            if self.status == "running" and self.done:
+                eta = elapsed / self.done * (self.total - self.done)
+            return {
+                "status": self.status,
+                "project_path": self.project_path,
+                "total": self.total,
+                "done": self.done,
+                "percent": int(self.done / self.total * 100) if self.total else 0,
+                "current_file": self.current[0] if self.current else None,
+                "timings": {tool: round(sec, 2) for tool, sec in self.timings.items()},
+                "elapsed": round(elapsed, 1),
+                "eta": round(eta, 1) if eta is not None else None,
+                "error": self.error,
+            }